@@ -0,0 +1,32 @@
+import os
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+from uuid import uuid4
+
+
+@contextmanager
+def atomic_open(file_path: str) -> Iterator[BinaryIO]:
+    """ Open a file for binary writing so it is either completely written or absent
+    Writes go to a temporary file in the same directory, renamed over *file_path* when the block exits cleanly and
+    removed if it raises. The temporary file is created with the usual permissions (0o666 less the umask)
+
+    Parameters
+    ----------
+    file_path : str
+        Where the file should end up
+
+    Returns
+    -------
+    file object
+        Binary file object to write to
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    temp_path = os.path.join(directory, f'.tmp_{uuid4().hex}_{os.path.basename(file_path)}')
+    handle = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(handle, 'wb') as outfile:
+            yield outfile
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
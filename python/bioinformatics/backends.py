@@ -0,0 +1,467 @@
+""" Interchangeable implementations of the hot kernels
+
+Genome.get_kmer_counts, Genome.find_clumps and Motifs._build_kmer_probabilities dispatch through this module, so existing
+callers pick up a faster backend for large inputs. Their pure Python versions (the _reference_* methods) and
+distance.py are the reference. distance.hamming_distance and distance.get_neighborhood are not dispatched: they are
+called on a handful of characters at a time, where dispatching costs more than any backend saves; call
+*hamming_distance* and *get_neighborhood* here to use a backend explicitly. The NumPy and numba backends are only
+imported when first used so importing the package stays fast. *encode_sequence* and *kmer_codes* are the NumPy
+encoding every vectorized module (the backends, pwm.py, Motifs.projection_motif_search) shares.
+
+The backend is picked per call from the input size and what is installed, or forced with *set_backend* or the
+BIOINFORMATICS_BACKEND environment variable ('python', 'numpy', 'numba' or 'auto'). Setting BIOINFORMATICS_BACKEND_CHECK=1
+runs every dispatched call on the reference backend as well and raises BackendMismatchError if the results differ.
+"""
+import os
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+from importlib.util import find_spec
+from typing import Dict, List, Union
+
+from .distance import hamming_distance as _hamming_distance, get_neighborhood as _get_neighborhood
+
+# minimum input size before a backend is picked automatically
+AUTO_THRESHOLDS = {
+    'numpy': 10000,
+    'numba': 1000000,
+}
+
+_NUCLEOTIDES = 'ACGT'
+
+
+class BackendMismatchError(AssertionError):
+    """ A backend returned a different result than the reference backend """
+
+
+@lru_cache(maxsize=None)
+def _encoding_table():
+    import numpy
+    table = numpy.full(256, 4, dtype=numpy.uint8)
+    for num, nuc in enumerate(_NUCLEOTIDES):
+        table[ord(nuc)] = num
+    return table
+
+
+def encode_sequence(sequence: str):
+    """ Nucleotides of a sequence as a NumPy array (requires numpy), shared by the vectorized code
+
+    Parameters
+    ----------
+    sequence : str
+        String of nucleotides
+
+    Returns
+    -------
+    numpy.ndarray
+        uint8 array as long as *sequence*, A, C, G and T are 0-3 and any other character is 4
+    """
+    import numpy
+    return _encoding_table()[numpy.frombuffer(sequence.encode('ascii', 'replace'), dtype=numpy.uint8)]
+
+
+def kmer_codes(nums, k: int):
+    """ Base 4 code of every kmer of an encoded sequence, the vectorized *DNA.kmer_codes*
+
+    Parameters
+    ----------
+    nums : numpy.ndarray
+        Sequence from *encode_sequence*, only meaningful for kmers without a 4
+    k : int
+        Length of kmers, at most 31
+
+    Returns
+    -------
+    numpy.ndarray
+        int64 code of the kmer starting at each index, empty if the sequence is shorter than k
+    """
+    import numpy
+    n = max(len(nums) - k + 1, 0)
+    codes = numpy.zeros(n, dtype=numpy.int64)
+    for j in range(k):
+        codes = (codes << 2) | nums[j: j + n]
+    return codes
+
+
+class PythonBackend:
+    """ Reference implementations, the existing pure Python code """
+    name = 'python'
+
+    def hamming_distance(self, p: Union[List[str], str], q: str) -> int:
+        return _hamming_distance(p, q)
+
+    def get_neighborhood(self, pattern: str, alphabet: str, max_distance: int) -> List[str]:
+        return _get_neighborhood(pattern, alphabet, max_distance)
+
+    def get_kmer_counts(self, sequence: str, k: int, count_reverse_complement=False, max_distance=0) -> Counter:
+        from .genome import Genome
+        return Genome._reference_get_kmer_counts(sequence, k, count_reverse_complement, max_distance)
+
+    def build_kmer_probabilities(self, sequence: str, probability_profile: Dict[str, List[float]], k: int) -> list:
+        from .motifs import Motifs
+        return Motifs._reference_build_kmer_probabilities(sequence, probability_profile, k)
+
+    def find_clumps(self, sequence: str, k: int, L: int, t: int) -> List[str]:
+        from .genome import Genome
+        return Genome(sequence)._reference_find_clumps(k, L, t)
+
+
+class NumpyBackend(PythonBackend):
+    """ Vectorized implementations over integer coded sequences
+    Inputs these can't represent (non nucleotide characters, kmers longer than 31) fall back to the reference
+    """
+    name = 'numpy'
+    # the neighborhoods of at most this many (origin, neighbor) pairs, before removing duplicates, are built at once
+    ball_batch = 1 << 20
+    # neighbor counts are summed into a dense array of 4 ** k counters when it has at most this many entries (and
+    # fewer than the pairs it replaces), otherwise batches are merged as sorted unique codes
+    dense_limit = 1 << 22
+
+    def __init__(self):
+        import numpy
+        self.np = numpy
+
+    def _encode(self, sequence: str):
+        """ Nucleotides as 0-3, or None if the sequence contains anything else """
+        nums = encode_sequence(sequence)
+        if nums.size and nums.max() > 3:
+            return None
+        return nums
+
+    def _kmer_codes(self, nums, k: int):
+        return kmer_codes(nums, k)
+
+    def _decode(self, codes, k: int, alphabet=_NUCLEOTIDES) -> List[str]:
+        np = self.np
+        base = len(alphabet)
+        powers = base ** np.arange(k - 1, -1, -1, dtype=np.int64)
+        digits = (codes[:, None] // powers) % base
+        chars = np.array([ord(c) for c in alphabet], dtype=np.uint32)[digits]
+        return np.ascontiguousarray(chars).view(f'U{k}').ravel().tolist()
+
+    def _ball(self, origins, codes, k: int, base: int, max_distance: int):
+        """ (origin, code) pairs for every code within *max_distance* substitutions of its origin's code """
+        np = self.np
+        powers = base ** np.arange(k, dtype=np.int64)
+        for _ in range(max_distance):
+            new_origins = [origins]
+            new_codes = [codes]
+            for power in powers:
+                digit = (codes // power) % base
+                cleared = codes - digit * power
+                for x in range(base):
+                    new_origins.append(origins)
+                    new_codes.append(cleared + x * power)
+            origins = np.concatenate(new_origins)
+            codes = np.concatenate(new_codes)
+            order = np.lexsort((codes, origins))
+            origins = origins[order]
+            codes = codes[order]
+            keep = np.ones(len(codes), dtype=bool)
+            keep[1:] = (np.diff(origins) != 0) | (np.diff(codes) != 0)
+            origins = origins[keep]
+            codes = codes[keep]
+        return origins, codes
+
+    def _reverse_complement_codes(self, codes, k: int):
+        rc = self.np.zeros_like(codes)
+        for j in range(k):
+            rc = (rc << 2) | (3 - ((codes >> (2 * j)) & 3))
+        return rc
+
+    def hamming_distance(self, p: Union[List[str], str], q: str) -> int:
+        np = self.np
+        if isinstance(p, str):
+            p = [p]
+        if any(len(i) != len(q) for i in p):
+            raise ValueError("Hamming Distance requires strings to be of equal length")
+        if not p or not q:
+            return 0
+        a = np.frombuffer(''.join(p).encode('utf-32-le'), dtype=np.uint32)
+        b = np.frombuffer(q.encode('utf-32-le'), dtype=np.uint32)
+        return int(np.count_nonzero(a.reshape(len(p), len(q)) != b))
+
+    def get_neighborhood(self, pattern: str, alphabet: str, max_distance: int) -> List[str]:
+        np = self.np
+        base = len(alphabet)
+        if max_distance == 0 or any(c not in alphabet for c in pattern) or base ** len(pattern) >= 2 ** 62:
+            return super().get_neighborhood(pattern, alphabet, max_distance)
+        code = 0
+        for char in pattern:
+            code = code * base + alphabet.index(char)
+        _, codes = self._ball(np.zeros(1, dtype=np.int64), np.array([code], dtype=np.int64),
+                              len(pattern), base, max_distance)
+        return self._decode(codes, len(pattern), alphabet)
+
+    def _neighbor_counts(self, codes, counts, k: int, max_distance: int):
+        """ Add the counts of each code to every code within *max_distance* of it, a batch of codes at a time so
+        memory is bounded by *ball_batch* rather than the number of codes times the size of their neighborhoods """
+        np = self.np
+        ball_size = (1 + 4 * k) ** max_distance  # bound on the pairs per code, duplicates are removed as it grows
+        batch = max(1, self.ball_batch // ball_size)
+        use_dense = 4 ** k <= min(self.dense_limit, len(codes) * ball_size)
+        dense = np.zeros(4 ** k, dtype=np.int64) if use_dense else None
+        pieces, pending = [], 0
+        for start in range(0, len(codes), batch):
+            origins, neighbors = self._ball(np.arange(start, min(start + batch, len(codes)), dtype=np.int64),
+                                            codes[start: start + batch], k, 4, max_distance)
+            if use_dense:
+                np.add.at(dense, neighbors, counts[origins])
+                continue
+            pieces.append(self._sum_by_code(neighbors, counts[origins]))
+            pending += len(pieces[-1][0])
+            if len(pieces) > 1 and pending > max(self.ball_batch, 2 * len(pieces[0][0])):
+                pieces = [self._sum_by_code(*map(np.concatenate, zip(*pieces)))]
+                pending = 0
+        if use_dense:
+            codes = np.flatnonzero(dense)
+            return codes, dense[codes]
+        if not pieces:
+            return codes, counts
+        return self._sum_by_code(*map(np.concatenate, zip(*pieces)))
+
+    def _sum_by_code(self, codes, counts):
+        """ Sorted unique codes and the total count of each """
+        np = self.np
+        codes, inverse = np.unique(codes, return_inverse=True)
+        return codes, np.bincount(inverse, weights=counts, minlength=len(codes)).astype(np.int64)
+
+    def _count_codes(self, codes, k: int, count_reverse_complement: bool, max_distance: int):
+        np = self.np
+        codes, counts = np.unique(codes, return_counts=True)
+        if max_distance:
+            codes, counts = self._neighbor_counts(codes, counts, k, max_distance)
+        if count_reverse_complement:
+            # neighbors of a reverse complement are the reverse complements of the neighbors
+            codes = np.concatenate([codes, self._reverse_complement_codes(codes, k)])
+            counts = np.concatenate([counts, counts])
+            codes, counts = self._sum_by_code(codes, counts)
+        return codes, counts
+
+    def get_kmer_counts(self, sequence: str, k: int, count_reverse_complement=False, max_distance=0) -> Counter:
+        nums = self._encode(sequence)
+        if nums is None or not 0 < k <= 31:
+            return super().get_kmer_counts(sequence, k, count_reverse_complement, max_distance)
+        codes, counts = self._count_codes(self._kmer_codes(nums, k), k, count_reverse_complement, max_distance)
+        # decoding builds k digits per code, a batch at a time so this stays small next to the Counter itself
+        step = max(1, self.ball_batch // k)
+        kmers = chain.from_iterable(self._decode(codes[i: i + step], k) for i in range(0, len(codes), step))
+        return Counter(dict(zip(kmers, counts.tolist())))
+
+    def build_kmer_probabilities(self, sequence: str, probability_profile: Dict[str, List[float]], k: int) -> list:
+        np = self.np
+        nums = self._encode(sequence)
+        if nums is None:
+            return super().build_kmer_probabilities(sequence, probability_profile, k)
+        matrix = np.array([probability_profile[nuc][:k] for nuc in _NUCLEOTIDES], dtype=np.float64)
+        n = max(len(nums) - k + 1, 0)
+        probabilities = np.ones(n)
+        for j in range(k):  # same order of multiplication as the reference, so results are bit for bit identical
+            probabilities *= matrix[nums[j: j + n], j]
+        return probabilities.tolist()
+
+    def find_clumps(self, sequence: str, k: int, L: int, t: int) -> List[str]:
+        np = self.np
+        nums = self._encode(sequence)
+        if nums is None or not 0 < k <= 31 or t < 1 or len(sequence) < k:
+            return super().find_clumps(sequence, k, L, t)
+        codes = self._kmer_codes(nums, k)
+        if len(codes) < t:
+            return []
+        order = np.argsort(codes, kind='stable')  # positions of each kmer stay in increasing order
+        sorted_codes = codes[order]
+        # a kmer forms a clump if its occurrences j and j + t - 1 start at most L - k apart
+        same = sorted_codes[t - 1:] == sorted_codes[:len(sorted_codes) - t + 1]
+        close = order[t - 1:] - order[:len(order) - t + 1] <= L - k
+        return self._decode(np.unique(sorted_codes[:len(sorted_codes) - t + 1][same & close]), k)
+
+
+class NumbaBackend(NumpyBackend):
+    """ JIT compiled loops for the kernels that are still sequential in NumPy """
+    name = 'numba'
+
+    def __init__(self):
+        super().__init__()
+        import numba
+        self._jit_kmer_codes = numba.njit(_kmer_codes_loop)
+        self._jit_kmer_probabilities = numba.njit(_kmer_probabilities_loop)
+
+    def _kmer_codes(self, nums, k: int):
+        codes = self.np.zeros(max(len(nums) - k + 1, 0), dtype=self.np.int64)
+        self._jit_kmer_codes(nums, k, codes)
+        return codes
+
+    def build_kmer_probabilities(self, sequence: str, probability_profile: Dict[str, List[float]], k: int) -> list:
+        np = self.np
+        nums = self._encode(sequence)
+        if nums is None:
+            return PythonBackend.build_kmer_probabilities(self, sequence, probability_profile, k)
+        matrix = np.array([probability_profile[nuc][:k] for nuc in _NUCLEOTIDES], dtype=np.float64)
+        probabilities = np.ones(max(len(nums) - k + 1, 0))
+        self._jit_kmer_probabilities(nums, matrix, k, probabilities)
+        return probabilities.tolist()
+
+
+# plain loops compiled by NumbaBackend, outputs are preallocated so they don't need numpy
+def _kmer_codes_loop(nums, k, codes):
+    mask = (1 << (2 * k)) - 1
+    code = 0
+    for i in range(len(nums)):
+        code = ((code << 2) | nums[i]) & mask
+        if i >= k - 1:
+            codes[i - k + 1] = code
+
+
+def _kmer_probabilities_loop(nums, matrix, k, probabilities):
+    for i in range(len(probabilities)):
+        prob = 1.0
+        for j in range(k):
+            prob *= matrix[nums[i + j], j]
+        probabilities[i] = prob
+
+
+_BACKENDS = {
+    'python': PythonBackend,
+    'numpy': NumpyBackend,
+    'numba': NumbaBackend,
+}
+_REQUIREMENTS = {
+    'python': [],
+    'numpy': ['numpy'],
+    'numba': ['numpy', 'numba'],
+}
+_instances: Dict[str, PythonBackend] = {}
+_forced_backend: Union[str, None] = None
+
+
+def available_backends() -> List[str]:
+    """ Names of the backends whose dependencies are installed """
+    return list(_available_backends())
+
+
+@lru_cache(maxsize=None)
+def _available_backends() -> tuple:
+    # looked up once, get_backend runs on every dispatched call
+    return tuple(name for name, modules in _REQUIREMENTS.items() if all(find_spec(module) for module in modules))
+
+
+def set_backend(name: Union[str, None]):
+    """ Force a backend for all kernels, 'auto' or None restores selection by input size
+
+    Parameters
+    ----------
+    name : str or None
+        One of 'python', 'numpy', 'numba' or 'auto'
+    """
+    global _forced_backend
+    if name not in (None, 'auto') and name not in _BACKENDS:
+        raise ValueError(f'Unknown backend {name}, expected one of {", ".join(_BACKENDS)} or auto')
+    _forced_backend = None if name == 'auto' else name
+
+
+def get_backend(size=0) -> PythonBackend:
+    """ Backend to use for an input of *size*, respecting *set_backend* and BIOINFORMATICS_BACKEND
+
+    Parameters
+    ----------
+    size : int, optional default 0
+        Size of the input, e.g. length of the sequence
+
+    Returns
+    -------
+    PythonBackend
+        Loaded backend
+    """
+    name = _forced_backend or os.environ.get('BIOINFORMATICS_BACKEND', 'auto')
+    if name == 'auto':
+        available = _available_backends()
+        name = 'python'
+        for candidate in ('numpy', 'numba'):
+            if candidate in available and size >= AUTO_THRESHOLDS[candidate]:
+                name = candidate
+    elif name not in _BACKENDS:
+        raise ValueError(f'Unknown backend {name}, expected one of {", ".join(_BACKENDS)} or auto')
+
+    return get_backend_by_name(name)
+
+
+def get_backend_by_name(name: str) -> PythonBackend:
+    """ Load a backend by name regardless of input size
+
+    Parameters
+    ----------
+    name : str
+        One of 'python', 'numpy' or 'numba'
+
+    Returns
+    -------
+    PythonBackend
+        Loaded backend
+    """
+    if name not in _instances:
+        _instances[name] = _BACKENDS[name]()
+    return _instances[name]
+
+
+def _normalize(kernel: str, result):
+    if kernel in ('get_neighborhood', 'find_clumps'):
+        return sorted(result)  # reference order is an implementation detail, compare as sets
+    if kernel == 'get_kmer_counts':
+        return dict(result)
+    return list(result) if kernel == 'build_kmer_probabilities' else result
+
+
+def compare_backends(kernel: str, *args) -> Dict[str, bool]:
+    """ Differential test: run a kernel on every available backend and compare against the reference
+
+    Parameters
+    ----------
+    kernel : str
+        Name of the kernel, e.g. 'get_kmer_counts'
+    args
+        Arguments for the kernel
+
+    Returns
+    -------
+    dict
+        Keys are backend names, values are whether the result is identical to the reference
+    """
+    expected = _normalize(kernel, getattr(get_backend_by_name('python'), kernel)(*args))
+    return {name: _normalize(kernel, getattr(get_backend_by_name(name), kernel)(*args)) == expected
+            for name in available_backends()}
+
+
+def _dispatch(kernel: str, size: int, *args):
+    backend = get_backend(size)
+    result = getattr(backend, kernel)(*args)
+    if backend.name != 'python' and os.environ.get('BIOINFORMATICS_BACKEND_CHECK', '') not in ('', '0'):
+        expected = getattr(get_backend_by_name('python'), kernel)(*args)
+        if _normalize(kernel, result) != _normalize(kernel, expected):
+            raise BackendMismatchError(f'{backend.name} backend result for {kernel} differs from the reference')
+    return result
+
+
+def hamming_distance(p: Union[List[str], str], q: str) -> int:
+    """ *distance.hamming_distance* on the selected backend """
+    return _dispatch('hamming_distance', len(q) * (1 if isinstance(p, str) else len(p)), p, q)
+
+
+def get_neighborhood(pattern: str, alphabet: str, max_distance: int) -> List[str]:
+    """ *distance.get_neighborhood* on the selected backend, order of the neighbors depends on the backend """
+    size = (len(pattern) * (len(alphabet) - 1)) ** max_distance  # roughly the number of neighbors
+    return _dispatch('get_neighborhood', size, pattern, alphabet, max_distance)
+
+
+def get_kmer_counts(sequence: str, k: int, count_reverse_complement=False, max_distance=0) -> Counter:
+    """ *Genome.get_kmer_counts* on the selected backend """
+    return _dispatch('get_kmer_counts', len(sequence), sequence, k, count_reverse_complement, max_distance)
+
+
+def build_kmer_probabilities(sequence: str, probability_profile: Dict[str, List[float]], k: int) -> list:
+    """ *Motifs._build_kmer_probabilities* on the selected backend """
+    return _dispatch('build_kmer_probabilities', len(sequence), sequence, probability_profile, k)
+
+
+def find_clumps(sequence: str, k: int, L: int, t: int) -> List[str]:
+    """ *Genome.find_clumps* on the selected backend, order of the kmers depends on the backend """
+    return _dispatch('find_clumps', len(sequence), sequence, k, L, t)
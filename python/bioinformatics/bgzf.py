@@ -0,0 +1,270 @@
+import gzip
+import io
+import os
+import struct
+import zlib
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Iterator, List, Tuple
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_BGZF_HEADER = struct.Struct('<4BI2BH')  # magic, method, flags, mtime, extra flags, os, extra length
+
+
+def open_text_file(file_path: str) -> IO[str]:
+    """ Open a plain text, gzip or BGZF file for reading text, detected from the first bytes of the file
+
+    Parameters
+    ----------
+    file_path : str
+        File we want to read
+
+    Returns
+    -------
+    file object
+        Text mode file object
+    """
+    with open(file_path, 'rb') as infile:
+        magic = infile.read(2)
+    if magic == _GZIP_MAGIC:
+        return io.TextIOWrapper(gzip.open(file_path, 'rb'))  # BGZF is a series of gzip members
+    return open(file_path, 'r')
+
+
+def is_bgzf(file_path: str) -> bool:
+    """ Whether a file is BGZF (blocked gzip, e.g. from bgzip) compressed
+
+    Parameters
+    ----------
+    file_path : str
+        File to check
+
+    Returns
+    -------
+    bool
+        True if the first block has a BGZF header
+    """
+    with open(file_path, 'rb') as infile:
+        try:
+            _read_block_size(infile)
+        except ValueError:
+            return False
+    return True
+
+
+def _read_block_size(infile: IO[bytes]) -> int:
+    """ Read a BGZF block header at the current position, return size of the whole block or 0 at end of file """
+    header = infile.read(_BGZF_HEADER.size)
+    if not header:
+        return 0
+    if len(header) < _BGZF_HEADER.size:
+        raise ValueError("Truncated BGZF block header")
+    id1, id2, method, flags, _, _, _, extra_length = _BGZF_HEADER.unpack(header)
+    if (id1, id2, method) != (0x1f, 0x8b, 8) or not flags & 4:
+        raise ValueError("Not a BGZF block")
+
+    extra = infile.read(extra_length)
+    offset = 0
+    while offset + 4 <= len(extra):
+        si1, si2, length = struct.unpack_from('<2BH', extra, offset)
+        if (si1, si2, length) == (66, 67, 2):  # 'BC' subfield holds the block size - 1
+            return struct.unpack_from('<H', extra, offset + 4)[0] + 1
+        offset += 4 + length
+    raise ValueError("BGZF block is missing its block size")
+
+
+def _inflate(block: bytes) -> bytes:
+    extra_length = struct.unpack_from('<H', block, 10)[0]
+    return zlib.decompress(block[12 + extra_length: -8], -15)
+
+
+def _sequence_bytes(data: bytes) -> bytes:
+    return data.replace(b'\n', b'').replace(b'\r', b'')
+
+
+class BgzfGenomeReader:
+    """ Random access to the genome sequence in a BGZF compressed file without inflating the whole file
+    A block index maps sequence coordinates (line breaks removed, as in *Genome.read_genome*) to compressed blocks
+
+    Parameters
+    ----------
+    file_path : str
+        BGZF compressed genome file
+    skip_header_rows : int, optional default 0
+        Do not read in the first n lines of file
+    workers : int, optional
+        Number of threads used to decompress blocks, defaults to the number of CPUs
+
+    Attributes
+    ----------
+    length : int
+        Number of nucleotides in the sequence
+    """
+
+    def __init__(self, file_path: str, skip_header_rows=0, workers: int = None):
+        self.file_path = file_path
+        self.skip_header_rows = skip_header_rows
+        self.workers = workers
+        # flat array of (compressed offset, compressed size, bytes of header to skip, sequence offset) per block
+        self._index = array('Q')
+        self._sequence_offsets: List[int] = []
+        self._indexed = False
+        self.length = 0
+
+    def build_index(self) -> 'BgzfGenomeReader':
+        """ Read every block once to record where each part of the sequence is stored
+
+        Returns
+        -------
+        BgzfGenomeReader
+            This reader, ready for *fetch*
+        """
+        blocks = list(self._block_offsets())
+        skips = [0] * len(blocks)
+
+        # header lines are usually only in the first block, find where they end sequentially
+        header_lines = self.skip_header_rows
+        block_number = 0
+        while header_lines and block_number < len(blocks):
+            data = _inflate(self._read_raw(*blocks[block_number]))
+            position = 0
+            while header_lines and position < len(data):
+                newline = data.find(b'\n', position)
+                if newline == -1:
+                    position = len(data)
+                else:
+                    position = newline + 1
+                    header_lines -= 1
+            skips[block_number] = position
+            block_number += 1
+
+        with ThreadPoolExecutor(self.workers) as executor:
+            lengths = executor.map(lambda args: len(_sequence_bytes(self._read_block(*args))),
+                                   [(offset, size, skip) for (offset, size), skip in zip(blocks, skips)])
+
+            self._index = array('Q')
+            self._sequence_offsets = []
+            sequence_offset = 0
+            for (offset, size), skip, length in zip(blocks, skips, lengths):
+                if not length:
+                    continue
+                self._index.extend((offset, size, skip, sequence_offset))
+                self._sequence_offsets.append(sequence_offset)
+                sequence_offset += length
+        self.length = sequence_offset
+        self._indexed = True
+        return self
+
+    def _file_stamp(self) -> List[int]:
+        """ Size and modification time of the file, an index saved for another version of the file is stale """
+        status = os.stat(self.file_path)
+        return [status.st_size, status.st_mtime_ns]
+
+    def save_index(self, index_path: str):
+        """ Save the block index so it only needs to be built once per file
+        The size and modification time of the genome file are saved with it, see *load_index*
+
+        Parameters
+        ----------
+        index_path : str
+            Where to save the index
+        """
+        with open(index_path, 'wb') as outfile:
+            array('Q', [self.length, self.skip_header_rows, *self._file_stamp()]).tofile(outfile)
+            self._index.tofile(outfile)
+
+    def load_index(self, index_path: str) -> 'BgzfGenomeReader':
+        """ Load a block index saved with *save_index*, the genome file must not have changed since
+
+        Parameters
+        ----------
+        index_path : str
+            File the index was saved to
+
+        Returns
+        -------
+        BgzfGenomeReader
+            This reader, ready for *fetch*
+        """
+        with open(index_path, 'rb') as infile:
+            values = array('Q')
+            values.frombytes(infile.read())
+        if len(values) < 4 or (len(values) - 4) % 4:
+            raise ValueError(f'{index_path} is not a BGZF genome index')
+        length, skip_header_rows = values[0], values[1]
+        if skip_header_rows != self.skip_header_rows:
+            raise ValueError(f'Index was built with skip_header_rows={skip_header_rows}')
+        if list(values[2:4]) != self._file_stamp():
+            raise ValueError(f'Index is stale, {self.file_path} changed since it was built')
+        self.length = length
+        self._index = values[4:]
+        self._sequence_offsets = list(self._index[3::4])
+        self._indexed = True
+        return self
+
+    def _block_offsets(self) -> Iterator[Tuple[int, int]]:
+        with open(self.file_path, 'rb') as infile:
+            offset = 0
+            while True:
+                infile.seek(offset)
+                size = _read_block_size(infile)
+                if not size:
+                    return
+                yield offset, size
+                offset += size
+
+    def _read_raw(self, offset: int, size: int) -> bytes:
+        with open(self.file_path, 'rb') as infile:
+            infile.seek(offset)
+            return infile.read(size)
+
+    def _read_block(self, offset: int, size: int, skip: int) -> bytes:
+        return _inflate(self._read_raw(offset, size))[skip:]
+
+    def _blocks(self, first: int, last: int) -> List[Tuple[int, int, int]]:
+        return [tuple(self._index[4 * i: 4 * i + 3]) for i in range(first, last)]
+
+    def fetch(self, start: int, end: int) -> str:
+        """ Get part of the sequence, equivalent to sequence[start:end], only inflating the blocks it spans
+
+        Parameters
+        ----------
+        start : int
+            Index of first nucleotide
+        end : int
+            Index after the last nucleotide
+
+        Returns
+        -------
+        str
+            Nucleotides from *start* up to *end*
+        """
+        if not self._indexed:
+            self.build_index()
+        start, end, _ = slice(start, end).indices(self.length)
+        if start >= end:
+            return ''
+
+        first = bisect_right(self._sequence_offsets, start) - 1
+        last = bisect_right(self._sequence_offsets, end - 1)
+        blocks = self._blocks(first, last)
+        if len(blocks) > 1:
+            with ThreadPoolExecutor(self.workers) as executor:
+                data = b''.join(executor.map(lambda args: _sequence_bytes(self._read_block(*args)), blocks))
+        else:
+            data = _sequence_bytes(self._read_block(*blocks[0]))
+        block_start = self._sequence_offsets[first]
+        return data[start - block_start: end - block_start].decode('ascii')
+
+    def read(self) -> str:
+        """ Get the whole sequence, decompressing blocks in parallel
+
+        Returns
+        -------
+        str
+            Genome sequence
+        """
+        if not self._indexed:
+            self.build_index()
+        return self.fetch(0, self.length)
@@ -0,0 +1,76 @@
+import gzip
+import os
+import pickle
+import time
+from typing import Any, Dict, Union
+
+from .atomic import atomic_open
+
+
+class Checkpoint:
+    """ Periodically save the state of a long running search or scan so it can be resumed after being killed
+    Saved as a gzipped pickle, written to a temporary file and renamed so a crash never leaves a partial checkpoint
+
+    Parameters
+    ----------
+    file_path : str
+        Where to save the checkpoint
+    interval : float, optional default 60
+        Minimum number of seconds between saves, 0 saves at every opportunity
+
+    Attributes
+    ----------
+    saves : int
+        Number of times the state was saved
+    """
+
+    def __init__(self, file_path: str, interval=60.0):
+        self.file_path = file_path
+        self.interval = interval
+        self.saves = 0
+        self._last_save = time.monotonic()
+
+    def due(self) -> bool:
+        """ Whether *interval* seconds have passed since the last save """
+        return time.monotonic() - self._last_save >= self.interval
+
+    def save(self, state: Dict[str, Any]):
+        """ Save *state*, replacing the previous checkpoint
+
+        Parameters
+        ----------
+        state : dict
+            Everything needed to resume, must be picklable
+        """
+        with atomic_open(self.file_path) as raw, gzip.GzipFile(fileobj=raw, mode='wb') as outfile:
+            pickle.dump(state, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+        self.saves += 1
+        self._last_save = time.monotonic()
+
+    def load(self, kind: str, parameters: Dict[str, Any] = None) -> Union[Dict[str, Any], None]:
+        """ Load the saved state, if any
+
+        Parameters
+        ----------
+        kind : str
+            What was checkpointed, e.g. 'gibbs_sampler'
+        parameters : dict, optional
+            Parameters of the run being resumed, must equal those the checkpoint was saved with if given
+
+        Returns
+        -------
+        dict or None
+            The saved state, None if there is no checkpoint
+        """
+        if not os.path.exists(self.file_path):
+            return None
+        with gzip.open(self.file_path, 'rb') as infile:
+            state = pickle.load(infile)
+        if state.get('kind') != kind or (parameters is not None and state.get('parameters') != parameters):
+            raise ValueError(f'Checkpoint {self.file_path} was saved by a different {kind} run')
+        return state
+
+    def remove(self):
+        """ Delete the checkpoint, e.g. once the run it belongs to has finished """
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
@@ -0,0 +1,168 @@
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+from .genome import Genome
+
+
+class CompositionIndex:
+    """ Sampled prefix counts of each nucleotide, answers composition queries over any interval in constant time
+    A query looks up the nearest sample and counts at most *sample_rate* - 1 remaining characters
+
+    Parameters
+    ----------
+    genome : Genome
+        Genome to index
+    sample_rate : int, optional default 64
+        Store prefix counts every *sample_rate* positions, 1 stores every position
+
+    Attributes
+    ----------
+    prefix_counts : dict
+        Keys are the nucleotides, values[i] is how many times it occurs in sequence[:i * sample_rate]
+    """
+
+    def __init__(self, genome: Genome, sample_rate=64):
+        if sample_rate < 1:
+            raise ValueError("sample_rate must be positive")
+        self.genome = genome
+        self.sample_rate = sample_rate
+        self.length = len(genome.sequence)
+
+        sequence = genome.sequence
+        self.prefix_counts: Dict[str, array] = {}
+        for nuc in genome.nucleobases:
+            counts = array('I', [0])
+            total = 0
+            for start in range(0, self.length, sample_rate):
+                total += sequence.count(nuc, start, start + sample_rate)
+                counts.append(total)
+            self.prefix_counts[nuc] = counts
+
+    def _prefix(self, nuc: str, position: int) -> int:
+        sample = position // self.sample_rate
+        start = sample * self.sample_rate
+        return self.prefix_counts[nuc][sample] + self.genome.sequence.count(nuc, start, position)
+
+    def _check(self, start: int, end: int) -> Tuple[int, int]:
+        if not 0 <= start <= end <= self.length:
+            raise IndexError(f'Interval [{start}, {end}) is outside of genome of length {self.length}')
+        return start, end
+
+    def counts(self, start: int, end: int) -> Dict[str, int]:
+        """ Number of each nucleotide in sequence[start:end]
+
+        Parameters
+        ----------
+        start : int
+            Index of first nucleotide
+        end : int
+            Index after the last nucleotide
+
+        Returns
+        -------
+        dict
+            Keys are the nucleotides, values are their counts
+        """
+        start, end = self._check(start, end)
+        return {nuc: self._prefix(nuc, end) - self._prefix(nuc, start) for nuc in self.prefix_counts}
+
+    def gc_content(self, start: int, end: int) -> float:
+        """ Fraction of sequence[start:end] that is G or C
+
+        Parameters
+        ----------
+        start : int
+            Index of first nucleotide
+        end : int
+            Index after the last nucleotide
+
+        Returns
+        -------
+        float
+            GC fraction, 0 for an empty interval
+        """
+        start, end = self._check(start, end)
+        if start == end:
+            return 0.0
+        gc = self._prefix('G', end) - self._prefix('G', start) + self._prefix('C', end) - self._prefix('C', start)
+        return gc / (end - start)
+
+    def skew(self, start: int, end: int) -> int:
+        """ Change in skew over sequence[start:end], G increases by 1 and C decreases by 1 as in *Genome.minimum_skew*
+
+        Parameters
+        ----------
+        start : int
+            Index of first nucleotide
+        end : int
+            Index after the last nucleotide
+
+        Returns
+        -------
+        int
+            Number of G minus number of C
+        """
+        start, end = self._check(start, end)
+        return self._prefix('G', end) - self._prefix('G', start) - self._prefix('C', end) + self._prefix('C', start)
+
+    def counts_many(self, intervals: Iterable[Tuple[int, int]]) -> List[Dict[str, int]]:
+        """ *counts* for each (start, end) in *intervals* """
+        return [self.counts(start, end) for start, end in intervals]
+
+    def gc_content_many(self, intervals: Iterable[Tuple[int, int]]) -> List[float]:
+        """ *gc_content* for each (start, end) in *intervals* """
+        return [self.gc_content(start, end) for start, end in intervals]
+
+    def skew_many(self, intervals: Iterable[Tuple[int, int]]) -> List[int]:
+        """ *skew* for each (start, end) in *intervals* """
+        return [self.skew(start, end) for start, end in intervals]
+
+    def track(self, bin_size: int, metric='gc') -> List[float]:
+        """ Metric for consecutive bins covering the whole genome, e.g. for plotting
+
+        Parameters
+        ----------
+        bin_size : int
+            Number of nucleotides per bin, the last bin may be shorter
+        metric : str, optional default 'gc'
+            'gc' for GC fraction, 'skew' for change in skew, or a nucleotide for its count
+
+        Returns
+        -------
+        list
+            One value per bin
+        """
+        intervals = [(start, min(start + bin_size, self.length)) for start in range(0, self.length, bin_size)]
+        if metric == 'gc':
+            return self.gc_content_many(intervals)
+        if metric == 'skew':
+            return self.skew_many(intervals)
+        if metric in self.prefix_counts:
+            return [self._prefix(metric, end) - self._prefix(metric, start) for start, end in intervals]
+        raise ValueError(f'Unknown metric {metric}, expected gc, skew or a nucleotide')
+
+    def multi_resolution_track(self, min_bin_size: int, metric='gc') -> Dict[int, List[float]]:
+        """ *track* at bin sizes doubling from *min_bin_size* until a single bin covers the genome
+        Lets a plot pick the resolution that matches the zoom level
+
+        Parameters
+        ----------
+        min_bin_size : int
+            Smallest number of nucleotides per bin
+        metric : str, optional default 'gc'
+            'gc' for GC fraction, 'skew' for change in skew, or a nucleotide for its count
+
+        Returns
+        -------
+        dict
+            Keys are bin sizes, values are the track at that resolution
+        """
+        if min_bin_size < 1:
+            raise ValueError("min_bin_size must be positive")
+        tracks = {}
+        bin_size = min_bin_size
+        while True:
+            tracks[bin_size] = self.track(bin_size, metric)
+            if bin_size >= self.length:
+                return tracks
+            bin_size *= 2
@@ -0,0 +1,144 @@
+import time
+from math import ceil
+from collections import Counter
+
+
+class ConvergenceMonitor:
+    """ Decide when a randomized search with restarts can stop early, and keep count of the work it actually did
+    Lower scores are better, e.g. the motif distances of *Motifs.randomized_motif_search*
+
+    Stops once any of the following holds:
+        patience        the best score has not improved for this many restarts
+        confidence      the estimated probability that another restart ends with a score not seen yet is below
+                        1 - confidence. This is the Good-Turing estimate: the fraction of restarts whose score was
+                        seen exactly once. Once every score has been reached several times, a better one is unlikely.
+                        Scores are small integers so ties are common, the estimate is only trusted after at least
+                        1 / (1 - confidence) restarts and once the best score has been reached at least twice
+        time_budget     this many seconds have passed, checked between iterations
+
+    Parameters
+    ----------
+    patience : int, optional
+        Number of restarts without improvement before stopping
+    confidence : float, optional
+        Between 0 and 1, see above
+    time_budget : float, optional
+        Wall-clock seconds the search may run for
+    min_restarts : int, optional default 2
+        Never stop on *patience* or *confidence* before this many restarts
+
+    Attributes
+    ----------
+    restarts : int
+        Number of restarts finished
+    iterations : int
+        Number of iterations run over all restarts
+    seconds : float
+        Wall-clock seconds spent searching
+    best_score : float
+        Best score over all finished restarts
+    stopped : str or None
+        Why the search stopped early, one of 'patience', 'confidence', 'time_budget', None if it used its full budget
+    """
+
+    def __init__(self, patience: int = None, confidence: float = None, time_budget: float = None, min_restarts=2):
+        if confidence is not None and not 0 < confidence < 1:
+            raise ValueError('confidence must be between 0 and 1')
+        self.patience = patience
+        self.confidence = confidence
+        self.time_budget = time_budget
+        self.min_restarts = min_restarts
+        # enough restarts for a 1 - confidence chance of a new score to show up at all
+        self._confidence_restarts = ceil(round(1 / (1 - confidence), 6)) if confidence is not None else None
+        self.restarts = 0
+        self.iterations = 0
+        self.seconds = 0.0
+        self.best_score = float('inf')
+        self.stopped = None
+        self._since_improvement = 0
+        self._results = Counter()
+        self._start = None
+
+    def __getstate__(self):
+        # resumed searches keep counting from the seconds already spent, see *start*
+        self.seconds = self.elapsed()
+        state = self.__dict__.copy()
+        state['_start'] = None
+        return state
+
+    def start(self):
+        """ Start (or after unpickling, continue) the clock """
+        self._start = time.perf_counter() - self.seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start if self._start is not None else self.seconds
+
+    def iteration(self) -> bool:
+        """ Record one iteration
+
+        Returns
+        -------
+        bool
+            Whether the search should stop because it ran out of time
+        """
+        self.iterations += 1
+        if self.time_budget is not None and self.elapsed() >= self.time_budget:
+            self.stopped = 'time_budget'
+            return True
+        return False
+
+    def restart(self, score: float) -> bool:
+        """ Record the outcome of a finished restart
+
+        Parameters
+        ----------
+        score : float
+            Best score of the restart
+
+        Returns
+        -------
+        bool
+            Whether the search should stop, because it converged or ran out of time during this restart
+        """
+        self.restarts += 1
+        if score < self.best_score:
+            self.best_score = score
+            self._since_improvement = 0
+        else:
+            self._since_improvement += 1
+        self._results[score] += 1
+
+        if self.stopped is not None:  # ran out of time during this restart
+            return True
+        if self.restarts < self.min_restarts:
+            return False
+        if self.patience is not None and self._since_improvement >= self.patience:
+            self.stopped = 'patience'
+            return True
+        if (self.confidence is not None and self.restarts >= self._confidence_restarts
+                and self._results[self.best_score] >= 2 and self.unseen_probability() <= 1 - self.confidence):
+            self.stopped = 'confidence'
+            return True
+        return False
+
+    def unseen_probability(self) -> float:
+        """ Good-Turing estimate of the probability that the next restart ends with a score no restart has yet """
+        if not self.restarts:
+            return 1.0
+        return sum(1 for count in self._results.values() if count == 1) / self.restarts
+
+    def report(self) -> dict:
+        """ Work done by the search
+
+        Returns
+        -------
+        dict
+            restarts, iterations, seconds, best_score and stopped
+        """
+        return {
+            'restarts': self.restarts,
+            'iterations': self.iterations,
+            'seconds': self.elapsed(),
+            'best_score': self.best_score,
+            'stopped': self.stopped,
+        }
@@ -1,7 +1,13 @@
+import gzip
+import sys
+from itertools import islice
 from os.path import exists
-from typing import Tuple
+from typing import Iterable, Iterator, Tuple, Union
 from errno import EEXIST
 
+from .atomic import atomic_open
+from .bgzf import open_text_file
+
 
 def parse_genome_file(file_path: str, has_header=False, has_footer=False, join_character='') -> Tuple[str, str, str]:
     """ Read in genome file, and keep header/footer separate if necessary.
@@ -9,7 +15,7 @@ def parse_genome_file(file_path: str, has_header=False, has_footer=False, join_c
     Parameters
     ----------
     file_path
-        File we want to read genome from
+        File we want to read genome from, may be plain text, gzip or BGZF compressed
     has_header
         Whether or not file has a header, assumes 1 line
     has_footer
@@ -21,7 +27,7 @@ def parse_genome_file(file_path: str, has_header=False, has_footer=False, join_c
     tuple
         index 0 is the genome, index 1 is the header, index 2 is the footer
     """
-    with open(file_path, 'r') as infile:
+    with open_text_file(file_path) as infile:
         header = ''
         footer = ''
         body = infile.read().splitlines()
@@ -36,31 +42,90 @@ def parse_genome_file(file_path: str, has_header=False, has_footer=False, join_c
 
 # submissions are expected to only have space separators
 def print_formatted_output(answer, joiner=' '):
-    if isinstance(answer, list):
-        if isinstance(answer[0], str):
-            print(joiner.join(answer))
-        else:
-            print(joiner.join(str(i) for i in answer))
+    if isinstance(answer, list) or _is_array(answer):
+        for chunk in _output_chunks(answer, joiner):
+            sys.stdout.write(chunk)
+        sys.stdout.write('\n')
     else:
         print(answer)
 
 
-def save_to_file(file_path: str, output: str, overwrite=False):
+def save_to_file(file_path: str, output: Union[str, Iterable], overwrite=False):
     """ Save data to file in 'output' directory
 
     Parameters
     ----------
     file_path : str
         Where and what to name the file
-    output : str
-        Information we want to save in file
+    output : str or iterable
+        Information we want to save in file, iterables are space separated
     overwrite : bool, default False
     """
+    write_output(file_path, output, overwrite=overwrite)
+
+
+def write_output(file_path: str, output: Union[str, Iterable], joiner=' ', overwrite=False, compress: bool = None,
+                 binary=False, chunk_size=65536):
+    """ Stream output to a file in buffered chunks, never building the whole output as one string
+    The file is written to a temporary file in the same directory and renamed, so it is either complete or absent
+
+    Parameters
+    ----------
+    file_path : str
+        Where and what to name the file
+    output : str, iterable or numpy array
+        Information we want to save in file, elements of iterables are converted with str and joined by *joiner*
+    joiner : str, optional default ' '
+        What to separate elements of *output* with
+    overwrite : bool, default False
+    compress : bool, optional
+        Whether to gzip the output, defaults to True if *file_path* ends with '.gz'
+    binary : bool, default False
+        Save *output* as a NumPy array in .npy format instead of text (requires numpy)
+    chunk_size : int, optional default 65536
+        Number of elements to join and write at a time
+    """
     if not overwrite and exists(file_path):
         raise IOError(EEXIST, f'File {file_path} already exists')
+    if compress is None:
+        compress = file_path.endswith('.gz')
+
+    with atomic_open(file_path) as raw:
+        outfile = gzip.GzipFile(fileobj=raw, mode='wb') if compress else raw
+        try:
+            if binary:
+                import numpy
+                array = output if _is_array(output) else numpy.fromiter(output, dtype=numpy.int64)
+                numpy.save(outfile, array)
+            else:
+                for chunk in _output_chunks(output, joiner, chunk_size):
+                    outfile.write(chunk.encode())
+        finally:
+            if compress:
+                outfile.close()
+
+
+def _is_array(output) -> bool:
+    return hasattr(output, 'dtype') and hasattr(output, 'tolist')
+
+
+def _output_chunks(output: Union[str, Iterable], joiner=' ', chunk_size=65536) -> Iterator[str]:
+    """ Yield *output* as text, joining at most *chunk_size* elements at a time """
+    if isinstance(output, str):
+        yield output
+        return
+
+    if _is_array(output):
+        output = output.ravel()
+        chunks = (output[i: i + chunk_size].tolist() for i in range(0, len(output), chunk_size))
+    else:
+        iterator = iter(output)
+        chunks = iter(lambda: list(islice(iterator, chunk_size)), [])
 
-    with open(f'{file_path}', 'w') as outfile:
-        outfile.write(output)
+    prefix = ''
+    for chunk in chunks:
+        yield prefix + joiner.join(map(str, chunk))
+        prefix = joiner
 
 
 # sometimes multiple parameters are given in the header and footer, separated by a space
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List, Tuple
 from .distance import get_neighborhood
 
 
@@ -11,6 +11,10 @@ class DNA:
         Key is first letter of nucleobase, value is the full name
     dna_complement (class attribute) : dict
         Complement of each nucleobase, i.e. {'A': 'T', 'T': 'A', 'C': 'G', 'G': 'C'}
+    _complement_table (class attribute) : dict
+        *dna_complement* as a str.translate table, plus N (any nucleotide) as its own complement
+    _unknown_table (class attribute) : dict
+        str.translate table deleting every character *_complement_table* knows, what is left can't be complemented
     _nucleotide_int_map (class attribute): dict
         Map of nucleotides to ints in alphabetical order i.e. {'A': 0, 'C': 1, 'G': 2, 'T': 3}
     """
@@ -21,6 +25,9 @@ class DNA:
         'G': 'C'
     }
 
+    _complement_table = str.maketrans({**dna_complement, 'N': 'N'})
+    _unknown_table = str.maketrans('', '', 'ACGTN')
+
     nucleobases = {
         'A': 'Adenine',
         'C': 'Cytosine',
@@ -94,19 +101,110 @@ class DNA:
     @classmethod
     def get_reverse_complement(cls, pattern: str) -> str:
         """ Get reverse complement of a nucleotide sequence
-        e.g. ACTG -> CAGT
+        e.g. ACTG -> CAGT, an unknown nucleotide N stays N so genomes with gaps can be reverse complemented
+        Any other character (e.g. lower case nucleotides) raises KeyError, as looking it up in *dna_complement* would
 
         Parameters
         ----------
         pattern : str
-            Nucleotide sequence
+            Nucleotide sequence of upper case A, C, G, T and N
 
         Returns
         -------
         str
             Reverse complement of *pattern*
         """
-        return ''.join(reversed([cls.dna_complement[nuc] for nuc in pattern]))
+        unknown = pattern.translate(cls._unknown_table)
+        if unknown:
+            raise KeyError(unknown[0])
+        return pattern.translate(cls._complement_table)[::-1]
+
+    @classmethod
+    def indexed_kmer_codes(cls, sequence: str, k: int) -> Iterator[Tuple[int, int]]:
+        """ Rolling base 4 representation (see *pattern_to_number*) of every kmer in a sequence
+        Kmers containing a character that is not a nucleotide are skipped
+
+        Parameters
+        ----------
+        sequence : str
+            String of nucleotides
+        k : int
+            Length of kmers
+
+        Returns
+        -------
+        iterator
+            (start index, code) for each kmer
+        """
+        nucleotide_map = cls._nucleotide_int_map
+        mask = (1 << (2 * k)) - 1
+        code = 0
+        valid = 0  # number of consecutive nucleotides ending at current position
+        for i, nuc in enumerate(sequence):
+            num = nucleotide_map.get(nuc)
+            if num is None:
+                valid = 0
+                code = 0
+                continue
+            code = ((code << 2) | num) & mask
+            valid += 1
+            if valid >= k:
+                yield i - k + 1, code
+
+    @classmethod
+    def kmer_codes(cls, sequence: str, k: int) -> Iterator[int]:
+        """ Rolling base 4 representation of every kmer in a sequence, see *indexed_kmer_codes*
+
+        Parameters
+        ----------
+        sequence : str
+            String of nucleotides
+        k : int
+            Length of kmers
+
+        Returns
+        -------
+        iterator
+            Integer code of each kmer in order of occurrence
+        """
+        for _, code in cls.indexed_kmer_codes(sequence, k):
+            yield code
+
+    @classmethod
+    def canonical_kmer_codes(cls, sequence: str, k: int) -> Iterator[int]:
+        """ Rolling code of every kmer or its reverse complement, whichever is smaller
+        A kmer and its reverse complement share a canonical code, so both strands are counted from one pass
+
+        Parameters
+        ----------
+        sequence : str
+            String of nucleotides
+        k : int
+            Length of kmers
+
+        Returns
+        -------
+        iterator
+            Canonical integer code of each kmer in order of occurrence
+        """
+        nucleotide_map = cls._nucleotide_int_map
+        mask = (1 << (2 * k)) - 1
+        shift = 2 * (k - 1)
+        code = 0
+        rc_code = 0
+        valid = 0
+        for nuc in sequence:
+            num = nucleotide_map.get(nuc)
+            if num is None:
+                valid = 0
+                code = 0
+                rc_code = 0
+                continue
+            code = ((code << 2) | num) & mask
+            rc_code = (rc_code >> 2) | ((3 - num) << shift)  # complement is 3 - num with alphabetical map
+            valid += 1
+            if valid >= k:
+                yield code if code < rc_code else rc_code
 
     @classmethod
     def _get_neighbors(cls, pattern: str, max_distance: int) -> List[str]:
@@ -1,8 +1,15 @@
+import zlib
 from collections import Counter
 from itertools import product
-from typing import List
+from typing import Dict, List
+from . import backends
+from .bgzf import open_text_file
+from .checkpoint import Checkpoint
 from .distance import hamming_distance
 from .dna import DNA
+from .multipattern import multi_pattern_match_index
+from .origin import find_origin
+from .strand import StrandView
 
 
 class Genome(DNA):
@@ -28,7 +35,7 @@ class Genome(DNA):
         Parameters
         ----------
         file_path : str
-            File we want to read genome from
+            File we want to read genome from, may be plain text, gzip or BGZF compressed
         skip_header_rows : int, optional default 0
             Do not read in the first n lines of file
         skip_footer_rows : int, optional default 0
@@ -39,7 +46,7 @@ class Genome(DNA):
         str
             returns genome sequence
         """
-        with open(file_path, 'r') as infile:
+        with open_text_file(file_path) as infile:
             body = infile.read().splitlines()
 
             for i in range(skip_header_rows):
@@ -62,6 +69,28 @@ class Genome(DNA):
 
         return self.get_reverse_complement(self.sequence)
 
+    def strand(self, strand='+', start=0, end: int = None) -> StrandView:
+        """ Lazy view of (a window of) the genome on either strand, the reverse complement is only computed for
+        the parts that are read
+
+        Parameters
+        ----------
+        strand : str, optional default '+'
+            '+' for the genome sequence, '-' for its reverse complement
+        start : int, optional default 0
+            Index of first nucleotide of the window, in forward strand coordinates
+        end : int, optional
+            Index after the last nucleotide of the window, in forward strand coordinates
+
+        Returns
+        -------
+        StrandView
+            View of the window
+        """
+        if strand not in ('+', '-'):
+            raise ValueError("strand must be '+' or '-'")
+        return StrandView(self.sequence, start, end, reverse_complement=strand == '-')
+
     def pattern_count(self, pattern: str, max_distance=0) -> int:
         """ Count number of times a pattern occurs in genome
 
@@ -107,6 +136,26 @@ class Genome(DNA):
                 indices.append(i)
         return indices
 
+    def multi_pattern_match_index(self, patterns: List[str], max_distance=0,
+                                  include_reverse_complement=False) -> Dict[str, List[int]]:
+        """ Get indices for start location of many patterns with a single pass over the genome
+
+        Parameters
+        ----------
+        patterns : list
+            The patterns whose indices we wish to find, may be of different lengths
+        max_distance : int, optional default 0
+            Maximum allowable hamming distance from a pattern to count as a match
+        include_reverse_complement : bool, optional default False
+            Whether to also report where the (approximate) reverse complement of a pattern starts
+
+        Returns
+        -------
+        dict
+            Keys are the patterns, values are the sorted start indices of their occurrences in *genome*
+        """
+        return multi_pattern_match_index(self.sequence, patterns, max_distance, include_reverse_complement)
+
     def compute_all_frequencies_alphabetically(self, k: int, max_distance=0) -> List[int]:
         """ Make frequency array for each possible pattern of length *k*, alphabetically indexed
 
@@ -145,8 +194,14 @@ class Genome(DNA):
         Returns
         -------
         Counter
-            Counter of how many times each kmer occurred
+            Counter of how many times each kmer occurred, in order of first occurrence for the Python backend
         """
+        return backends.get_kmer_counts(sub_sequence, k, count_reverse_complement, max_distance)
+
+    @classmethod
+    def _reference_get_kmer_counts(cls, sub_sequence: str, k: int, count_reverse_complement=False,
+                                   max_distance=0) -> Counter:
+        """ Pure Python *get_kmer_counts*, the reference for the backends """
         def get_frequencies(pattern):
             freq = Counter()
 
@@ -160,13 +215,32 @@ class Genome(DNA):
         frequency = get_frequencies(sub_sequence)
 
         if count_reverse_complement:
-            rc = cls.get_reverse_complement(sub_sequence)
-            rc_frequency = get_frequencies(rc)
+            # kmers of the reverse complement (and their neighbors) are the reverse complements of the forward kmers,
+            # so count them from the forward counts instead of building the reverse complement sequence
+            rc_frequency = Counter({cls.get_reverse_complement(kmer): count for kmer, count in frequency.items()})
             frequency.update(rc_frequency)
 
         return frequency
 
-    def frequent_kmers(self, k: int, min_frequency=0, count_reverse_complement=False, max_distance=0) -> List[str]:
+    def canonical_kmer_counts(self, k: int) -> Counter:
+        """ Count kmers on both strands in one forward pass, a kmer and its reverse complement are counted together
+        under whichever is alphabetically first
+
+        Parameters
+        ----------
+        k : int
+            Length of kmers to get counts of
+
+        Returns
+        -------
+        Counter
+            Counter of how many times each canonical kmer occurred on either strand
+        """
+        codes = Counter(self.canonical_kmer_codes(self.sequence, k))
+        return Counter({self.number_to_pattern(code, k): count for code, count in codes.items()})
+
+    def frequent_kmers(self, k: int, min_frequency=0, count_reverse_complement=False, max_distance=0,
+                       checkpoint: Checkpoint = None) -> List[str]:
         """ Get all kmers in genome that appear a minimum number of times
 
         Parameters
@@ -179,16 +253,22 @@ class Genome(DNA):
             Whether we also want to add occurrences of the (approximate) reverse complement to our frequency
         max_distance : int, optional default 0
             Maximum allowable hamming distance to be considered a matching kmer
+        checkpoint : Checkpoint, optional
+            Count in chunks, periodically saving the partial counts here, see *checkpointed_kmer_counts*
 
         Returns
         -------
         list
             List of kmers that occurred at least the min number of times
         """
-        frequency = self.get_kmer_counts(self.sequence, k, count_reverse_complement, max_distance)
+        if checkpoint is not None:
+            frequency = self.checkpointed_kmer_counts(k, checkpoint, count_reverse_complement, max_distance)
+        else:
+            frequency = self.get_kmer_counts(self.sequence, k, count_reverse_complement, max_distance)
         return self.get_frequent_kmer(frequency, min_frequency)
 
-    def most_frequent_kmer(self, k: int, max_distance=0, count_reverse_complement=False) -> List[str]:
+    def most_frequent_kmer(self, k: int, max_distance=0, count_reverse_complement=False,
+                           checkpoint: Checkpoint = None) -> List[str]:
         """ Get only the most frequently occurring kmers in genome
 
         Parameters
@@ -199,17 +279,66 @@ class Genome(DNA):
             Whether we also want to add occurrences of the (approximate) reverse complement to our frequency
         max_distance : int, optional default 0
             Maximum allowable hamming distance to be considered a matching kmer
+        checkpoint : Checkpoint, optional
+            Count in chunks, periodically saving the partial counts here, see *checkpointed_kmer_counts*
 
         Returns
         -------
         list
             Most frequently occurring kmers
         """
-        frequency = self.get_kmer_counts(self.sequence, k, count_reverse_complement, max_distance)
+        if checkpoint is not None:
+            frequency = self.checkpointed_kmer_counts(k, checkpoint, count_reverse_complement, max_distance)
+        else:
+            frequency = self.get_kmer_counts(self.sequence, k, count_reverse_complement, max_distance)
         max_freq = frequency.most_common(1)[0][1]
 
         return self.get_frequent_kmer(frequency, max_freq)
 
+    def checkpointed_kmer_counts(self, k: int, checkpoint: Checkpoint, count_reverse_complement=False, max_distance=0,
+                                 chunk_size=100000) -> Counter:
+        """ *get_kmer_counts* over the whole genome in chunks, saving the counts so far and the next chunk offset
+        If the checkpoint exists counting resumes after the last saved chunk, it is removed when done. A checkpoint
+        saved for another sequence (told apart by length and CRC-32) or other parameters is refused with ValueError
+
+        Parameters
+        ----------
+        k : int
+            Length of kmers to get counts of
+        checkpoint : Checkpoint
+            Where to periodically save progress
+        count_reverse_complement : bool, optional default False
+            Whether we also want to add occurrences of the (approximate) reverse complement to our frequency
+        max_distance : int, optional default 0
+            Maximum hamming distance from a pattern to count as a match
+        chunk_size : int, optional default 100000
+            Number of kmers counted between chances to save
+
+        Returns
+        -------
+        Counter
+            Counter of how many times each kmer occurred
+        """
+        parameters = {'length': len(self.sequence), 'crc32': zlib.crc32(self.sequence.encode()), 'k': k,
+                      'count_reverse_complement': count_reverse_complement, 'max_distance': max_distance,
+                      'chunk_size': chunk_size}
+        state = checkpoint.load('kmer_counts', parameters)
+        offset, frequency = (state['offset'], state['frequency']) if state is not None else (0, Counter())
+
+        num_kmers = len(self.sequence) - k + 1
+        while offset < num_kmers:
+            end = min(offset + chunk_size, num_kmers)
+            # chunks overlap by k - 1 so every kmer is counted exactly once
+            frequency.update(self.get_kmer_counts(self.sequence[offset: end + k - 1], k, count_reverse_complement,
+                                                  max_distance))
+            offset = end
+            if checkpoint.due() and offset < num_kmers:
+                checkpoint.save({'kind': 'kmer_counts', 'parameters': parameters,
+                                 'offset': offset, 'frequency': frequency})
+
+        checkpoint.remove()
+        return frequency
+
     def find_clumps(self, k: int, L: int, t: int) -> List[str]:
         """ Find regularly occurring kmers in each clump of length *L*
         k : int
@@ -224,9 +353,12 @@ class Genome(DNA):
         list
             All kmers that appear at least *tslint.json* times in a clump of size *L*
         """
+        return backends.find_clumps(self.sequence, k, L, t)
 
+    def _reference_find_clumps(self, k: int, L: int, t: int) -> List[str]:
+        """ Pure Python *find_clumps*, the reference for the backends """
         # initialize counter with first clump
-        counter = self.get_kmer_counts(self.sequence[0: L], k)
+        counter = self._reference_get_kmer_counts(self.sequence[0: L], k)
         # define beginning and end k-mer for first clump
         first_kmer = self.sequence[0: k]
         frequent = self.get_frequent_kmer(counter, t)
@@ -271,6 +403,38 @@ class Genome(DNA):
         min_skew = min(steps)
         return [i for i, val in enumerate(steps) if val == min_skew]
 
+    def find_origin(self, k=9, max_distance=1, window=1000, L: int = None, t=3, circular=True,
+                    processes: int = None) -> List[dict]:
+        """ Find candidates for the origin of replication: windows around the minimum skew, with the most frequent
+        approximate kmers (counting reverse complements) and the reverse complement aware clumps in each
+        Only the windows are searched, never the whole genome, and windows are searched in parallel
+
+        Parameters
+        ----------
+        k : int, optional default 9
+            Length of the DnaA box
+        max_distance : int, optional default 1
+            Maximum hamming distance of an approximate occurrence
+        window : int, optional default 1000
+            Length of the window searched around each skew minimum, minima closer than this share a window
+        L : int, optional
+            Length of a clump, defaults to *window*
+        t : int, optional default 3
+            Minimum number of (exact, either strand) occurrences of a kmer in a clump
+        circular : bool, optional default True
+            Whether the genome is circular, windows near its ends then wrap around (start may be negative or end
+            past the genome length)
+        processes : int, optional
+            Number of worker processes, defaults to one per window
+
+        Returns
+        -------
+        list
+            dict per candidate window with keys start, end, skew_minima, max_count (of the most frequent kmers),
+            frequent_kmers and clumps
+        """
+        return find_origin(self.sequence, self.minimum_skew(), k, max_distance, window, L, t, circular, processes)
+
     @staticmethod
     def get_frequent_kmer(frequency: Counter, min_frequency: int) -> List[str]:
         """ Get all items in Counter that occur more than specified minimum
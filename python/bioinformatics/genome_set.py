@@ -0,0 +1,218 @@
+import glob
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+from .course_helper import write_output
+from .genome import Genome
+
+# stripped from file names to name genomes, compression first, e.g. GCF_000005845.2.fna.gz -> GCF_000005845.2
+_EXTENSIONS = ('.gz', '.bgz', '.txt', '.seq', '.fa', '.fna', '.fasta')
+
+
+def _genome_name(file_path: str) -> str:
+    name = os.path.basename(file_path)
+    for extension in _EXTENSIONS:
+        if name.lower().endswith(extension) and len(name) > len(extension):
+            name = name[:-len(extension)]
+    return name
+
+
+def _load_genome(file_path: str, skip_header_rows: int, skip_footer_rows: int) -> Genome:
+    genome = Genome()
+    genome.read_genome(file_path, skip_header_rows, skip_footer_rows)
+    return genome
+
+
+def _apply_worker(args) -> dict:
+    name, file_path, skip_header_rows, skip_footer_rows, method, method_args, method_kwargs = args
+    row = {'genome': name, 'method': method, 'length': None, 'result': None, 'error': None,
+           'load_seconds': 0.0, 'seconds': 0.0}
+    start = time.perf_counter()
+    try:
+        genome = _load_genome(file_path, skip_header_rows, skip_footer_rows)
+        row['length'] = len(genome.sequence)
+        row['load_seconds'] = time.perf_counter() - start
+        start = time.perf_counter()
+        row['result'] = getattr(genome, method)(*method_args, **method_kwargs)
+        row['seconds'] = time.perf_counter() - start
+    except Exception as error:  # one bad file must not stop the rest of the corpus
+        row['error'] = f'{type(error).__name__}: {error}'
+    return row
+
+
+class GenomeSet:
+    """ Many genome files, read only when needed, with *Genome* methods applied across all of them in parallel
+
+    Parameters
+    ----------
+    file_paths : list or dict
+        Genome files (plain text, gzip or BGZF), or a dict of name to file. Names default to the file name without
+        its genome and compression extensions (.txt, .seq, .fa, .fna, .fasta, .gz, .bgz), they must be unique
+    skip_header_rows : int, optional default 0
+        Lines to skip at the start of every file, see *Genome.read_genome*
+    skip_footer_rows : int, optional default 0
+        Lines to skip at the end of every file
+    prefetch : int, optional default 2
+        Number of files read ahead by background threads when iterating
+    """
+
+    def __init__(self, file_paths: Union[Sequence[str], Dict[str, str]], skip_header_rows=0, skip_footer_rows=0,
+                 prefetch=2):
+        if not isinstance(file_paths, dict):
+            paths = list(file_paths)
+            names = [_genome_name(path) for path in paths]
+            duplicates = sorted(name for name, count in Counter(names).items() if count > 1)
+            if duplicates:
+                raise ValueError(f'Genome files share names {", ".join(duplicates)}, pass a dict of name to file')
+            file_paths = dict(zip(names, paths))
+        self.file_paths = dict(file_paths)
+        self.skip_header_rows = skip_header_rows
+        self.skip_footer_rows = skip_footer_rows
+        self.prefetch = prefetch
+
+    @classmethod
+    def from_directory(cls, directory: str, pattern='*.txt', **kwargs) -> 'GenomeSet':
+        """ Every file in *directory* matching *pattern*, in sorted order
+
+        Parameters
+        ----------
+        directory : str
+            Directory to look in
+        pattern : str, optional default '*.txt'
+            Glob pattern of genome files
+        **kwargs
+            Passed on to *GenomeSet*
+
+        Returns
+        -------
+        GenomeSet
+            Set of the matching files
+        """
+        return cls(sorted(glob.glob(os.path.join(directory, pattern))), **kwargs)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.file_paths)
+
+    def __len__(self):
+        return len(self.file_paths)
+
+    def __getitem__(self, name: str) -> Genome:
+        """ Read genome *name*, nothing is cached so memory stays bounded """
+        return _load_genome(self.file_paths[name], self.skip_header_rows, self.skip_footer_rows)
+
+    def __iter__(self) -> Iterator[Tuple[str, Genome]]:
+        """ (name, Genome) in order, the next *prefetch* files are read by background threads while one is in use """
+        names = iter(self.file_paths)
+        with ThreadPoolExecutor(max(1, self.prefetch)) as executor:
+            pending = deque()
+            for name in names:
+                pending.append((name, executor.submit(self.__getitem__, name)))
+                if len(pending) > self.prefetch:
+                    name, future = pending.popleft()
+                    yield name, future.result()
+            while pending:
+                name, future = pending.popleft()
+                yield name, future.result()
+
+    def apply(self, method: str, *args, processes: int = None, max_in_flight: int = None,
+              **kwargs) -> Iterator[dict]:
+        """ Call a *Genome* method on every genome in a process pool, streaming a row per genome as each finishes
+        Workers read their genome themselves so sequences are never pickled, and at most *max_in_flight* genomes
+        are loaded at a time
+
+        Parameters
+        ----------
+        method : str
+            Name of the *Genome* method, e.g. 'minimum_skew' or 'find_clumps'
+        *args, **kwargs
+            Passed on to the method
+        processes : int, optional
+            Number of worker processes, defaults to the number of CPUs, 1 runs in this process
+        max_in_flight : int, optional
+            Maximum number of genomes submitted but not yet finished, defaults to twice the number of processes
+
+        Returns
+        -------
+        iterator
+            dict per genome, in order of completion, with keys
+            genome, method, length, result, error (None if the call succeeded), load_seconds and seconds
+        """
+        if not callable(getattr(Genome, method, None)) or method.startswith('_'):
+            raise ValueError(f'Unknown Genome method {method}')
+        return self._apply(method, args, kwargs, processes, max_in_flight)
+
+    def _apply(self, method: str, args: tuple, kwargs: dict, processes: int, max_in_flight: int) -> Iterator[dict]:
+        tasks = ((name, path, self.skip_header_rows, self.skip_footer_rows, method, args, kwargs)
+                 for name, path in self.file_paths.items())
+        if processes == 1:
+            yield from map(_apply_worker, tasks)
+            return
+
+        if max_in_flight is None:
+            max_in_flight = 2 * (processes or os.cpu_count() or 1)
+        with ProcessPoolExecutor(processes) as executor:
+            in_flight = set()
+            for task in tasks:
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                in_flight.add(executor.submit(_apply_worker, task))
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    @staticmethod
+    def tidy(rows: Iterable[dict]) -> Iterator[dict]:
+        """ One row per value of each result: list results give a row per element (with its index), Counter and
+        dict results a row per key, anything else (and empty results) a single row
+
+        Parameters
+        ----------
+        rows : iterable
+            Rows from *apply*
+
+        Returns
+        -------
+        iterator
+            dicts with keys genome, method, key, value, error, load_seconds and seconds
+        """
+        for row in rows:
+            base = {'genome': row['genome'], 'method': row['method']}
+            timing = {'error': row['error'], 'load_seconds': row['load_seconds'], 'seconds': row['seconds']}
+            result = row['result']
+            if isinstance(result, dict):
+                items = result.items()
+            elif isinstance(result, (list, tuple, set)):
+                items = enumerate(result)
+            else:
+                items = [(None, result)]
+            items = list(items) or [(None, None)]  # keep genomes with empty results in the table
+            for key, value in items:
+                yield {**base, 'key': key, 'value': value, **timing}
+
+    @classmethod
+    def save_table(cls, rows: Iterable[dict], file_path: str, overwrite=False):
+        """ Write rows from *apply* to a tab separated file in tidy form, see *tidy*, streaming as they arrive
+
+        Parameters
+        ----------
+        rows : iterable
+            Rows from *apply*
+        file_path : str
+            Where to save the table, gzipped if it ends with '.gz'
+        overwrite : bool, default False
+        """
+        columns = ['genome', 'method', 'key', 'value', 'error', 'load_seconds', 'seconds']
+
+        def lines():
+            yield '\t'.join(columns)
+            for row in cls.tidy(rows):
+                yield '\t'.join('' if row[column] is None else str(row[column]) for column in columns)
+
+        write_output(file_path, lines(), joiner='\n', overwrite=overwrite, chunk_size=1024)
@@ -0,0 +1,245 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappush, heapreplace
+from math import log
+from typing import Iterable, List, Mapping, Sequence, Tuple, Union
+
+from .dna import DNA
+from .genome import Genome
+from .sketch import hash_64
+
+
+class MinHashSketch:
+    """ Bottom-k MinHash sketch of the canonical kmers of a genome
+
+    Parameters
+    ----------
+    k : int, optional default 21
+        Length of kmers
+    size : int, optional default 1000
+        Number of smallest hashes to keep, error of the Jaccard estimate is roughly 1 / sqrt(size)
+    seed : int, optional default 0
+        Seed of the hash function, sketches must share k, size and seed to be compared
+    name : str, optional default ''
+        Label for the sketch, e.g. the file it was made from
+
+    Attributes
+    ----------
+    hashes : list
+        Smallest *size* distinct kmer hashes, sorted ascending
+    """
+
+    def __init__(self, k=21, size=1000, seed=0, name=''):
+        self.k = k
+        self.size = size
+        self.seed = seed
+        self.name = name
+        self.hashes: List[int] = []
+
+    @classmethod
+    def from_genome(cls, genome: Union[Genome, str], k=21, size=1000, seed=0, name='') -> 'MinHashSketch':
+        """ Sketch a genome
+
+        Parameters
+        ----------
+        genome : Genome or str
+            Genome or nucleotide sequence to sketch
+        k : int, optional default 21
+            Length of kmers
+        size : int, optional default 1000
+            Number of hashes to keep
+        seed : int, optional default 0
+            Seed of the hash function
+        name : str, optional default ''
+            Label for the sketch
+
+        Returns
+        -------
+        MinHashSketch
+            Sketch of *genome*
+        """
+        sketch = cls(k, size, seed, name)
+        sketch.add_sequence(genome.sequence if isinstance(genome, Genome) else genome)
+        return sketch
+
+    def add_sequence(self, sequence: str):
+        """ Add the canonical kmers of a sequence (e.g. another contig) to the sketch
+
+        Parameters
+        ----------
+        sequence : str
+            String of nucleotides
+        """
+        heap = [-h for h in self.hashes]  # max heap of the smallest hashes
+        heap.sort()
+        kept = set(self.hashes)
+        for code in DNA.canonical_kmer_codes(sequence, self.k):
+            hashed = hash_64(code, self.seed)
+            if hashed in kept:
+                continue
+            if len(heap) < self.size:
+                heappush(heap, -hashed)
+                kept.add(hashed)
+            elif hashed < -heap[0]:
+                kept.discard(-heapreplace(heap, -hashed))
+                kept.add(hashed)
+        self.hashes = sorted(kept)
+
+    def _check_compatible(self, other: 'MinHashSketch'):
+        if (self.k, self.size, self.seed) != (other.k, other.size, other.seed):
+            raise ValueError("MinHash sketches must have the same k, size and seed to be compared")
+
+    def jaccard(self, other: 'MinHashSketch') -> float:
+        """ Estimate the Jaccard index between the kmer sets of two genomes
+
+        Parameters
+        ----------
+        other : MinHashSketch
+            Sketch to compare against
+
+        Returns
+        -------
+        float
+            Estimated Jaccard index between 0 and 1
+        """
+        self._check_compatible(other)
+        union = sorted(set(self.hashes) | set(other.hashes))[:self.size]
+        if not union:
+            return 0.0
+        mine = set(self.hashes)
+        theirs = set(other.hashes)
+        shared = sum(1 for h in union if h in mine and h in theirs)
+        return shared / len(union)
+
+    def distance(self, other: 'MinHashSketch') -> float:
+        """ Mash distance, an estimate of the per base mutation rate between two genomes
+
+        Parameters
+        ----------
+        other : MinHashSketch
+            Sketch to compare against
+
+        Returns
+        -------
+        float
+            Distance between 0 (identical) and 1 (no shared kmers)
+        """
+        jaccard = self.jaccard(other)
+        if jaccard == 0:
+            return 1.0
+        return min(1.0, max(0.0, -log(2 * jaccard / (1 + jaccard)) / self.k))
+
+    def to_dict(self) -> dict:
+        return {'name': self.name, 'k': self.k, 'size': self.size, 'seed': self.seed, 'hashes': self.hashes}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MinHashSketch':
+        sketch = cls(data['k'], data['size'], data['seed'], data.get('name', ''))
+        sketch.hashes = sorted(data['hashes'])
+        return sketch
+
+    def save(self, file_path: str):
+        """ Save sketch as JSON so it only needs to be computed once per genome
+
+        Parameters
+        ----------
+        file_path : str
+            Where to save the sketch
+        """
+        with open(file_path, 'w') as outfile:
+            json.dump(self.to_dict(), outfile)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'MinHashSketch':
+        """ Load a sketch saved with *save*
+
+        Parameters
+        ----------
+        file_path : str
+            File the sketch was saved to
+
+        Returns
+        -------
+        MinHashSketch
+            The saved sketch
+        """
+        with open(file_path, 'r') as infile:
+            return cls.from_dict(json.load(infile))
+
+
+_worker_sketches: List[MinHashSketch] = []
+
+
+def _init_worker(sketches: List[MinHashSketch]):
+    global _worker_sketches
+    _worker_sketches = sketches
+
+
+def _distance_row(i: int) -> List[float]:
+    return [_worker_sketches[i].distance(_worker_sketches[j]) for j in range(i + 1, len(_worker_sketches))]
+
+
+def _sketch_worker(args) -> MinHashSketch:
+    genome, k, size, seed, name = args
+    return MinHashSketch.from_genome(genome, k, size, seed, name)
+
+
+def sketch_genomes(genomes: Union[Mapping[str, Union[Genome, str]], Iterable[Tuple[str, Union[Genome, str]]],
+                                   Iterable[Union[Genome, str]]],
+                   k=21, size=1000, seed=0, processes: int = None) -> List[MinHashSketch]:
+    """ Sketch many genomes using a process pool, each sketch is named after its genome so rows of
+    *distance_matrix* can be told apart
+
+    Parameters
+    ----------
+    genomes : dict or iterable
+        Genomes or nucleotide sequences to sketch: a dict of name to genome, (name, genome) pairs such as a
+        *GenomeSet*, or bare genomes which are named by their position, '0', '1', ...
+    k : int, optional default 21
+        Length of kmers
+    size : int, optional default 1000
+        Number of hashes to keep per sketch
+    seed : int, optional default 0
+        Seed of the hash function
+    processes : int, optional
+        Number of worker processes, defaults to the number of CPUs
+
+    Returns
+    -------
+    list
+        Sketch of each genome, in the same order as *genomes*
+    """
+    items = genomes.items() if isinstance(genomes, Mapping) else genomes
+    tasks = []
+    for i, item in enumerate(items):
+        name, genome = item if isinstance(item, tuple) else (str(i), item)
+        tasks.append((genome, k, size, seed, name))
+    with ProcessPoolExecutor(processes) as executor:
+        return list(executor.map(_sketch_worker, tasks))
+
+
+def distance_matrix(sketches: Sequence[MinHashSketch], processes: int = None) -> List[List[float]]:
+    """ All vs all Mash distances, rows are computed in parallel
+
+    Parameters
+    ----------
+    sketches : list
+        Compatible sketches, e.g. from *sketch_genomes* or *MinHashSketch.load*
+    processes : int, optional
+        Number of worker processes, defaults to the number of CPUs
+
+    Returns
+    -------
+    list
+        Symmetric matrix where [i][j] is the distance between sketch i and sketch j, in the order of *sketches*
+        (see their *name*)
+    """
+    n = len(sketches)
+    matrix = [[0.0] * n for _ in range(n)]
+    with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(list(sketches),)) as executor:
+        for i, row in enumerate(executor.map(_distance_row, range(n))):
+            for offset, distance in enumerate(row):
+                j = i + 1 + offset
+                matrix[i][j] = distance
+                matrix[j][i] = distance
+    return matrix
@@ -0,0 +1,217 @@
+import struct
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Iterator, List, Tuple
+
+from .distance import hamming_distance
+from .dna import DNA
+from .genome import Genome
+from .sketch import hash_64
+
+# magic, k, w, sequence length, CRC-32 of the sequence, number of codes, number of positions
+_HEADER = struct.Struct('<4sIIQIQQ')
+_MAGIC = b'MZI2'
+
+
+def minimizers(sequence: str, k: int, w: int) -> Iterator[Tuple[int, int]]:
+    """ (w, k) minimizers of a sequence, the kmer with the smallest hash in every window of *w* consecutive kmers
+
+    Parameters
+    ----------
+    sequence : str
+        String of nucleotides
+    k : int
+        Length of kmers
+    w : int
+        Number of consecutive kmers in each window
+
+    Returns
+    -------
+    iterator
+        (start index, kmer code) of each distinct minimizer, in order of position
+    """
+    window = deque()  # (hash, start index, code) with increasing hashes, front is the current minimizer
+    last_position = -1
+    previous = -1
+    count = 0
+    for position, code in DNA.indexed_kmer_codes(sequence, k):
+        hashed = hash_64(code)
+        if position != previous + 1:
+            window.clear()  # a non nucleotide broke the run of kmers, start a new window
+            count = 0
+        previous = position
+        while window and window[-1][0] >= hashed:
+            window.pop()
+        window.append((hashed, position, code))
+        while window[0][1] <= position - w:
+            window.popleft()
+        count += 1
+        if count >= w and window[0][1] != last_position:
+            last_position = window[0][1]
+            yield last_position, window[0][2]
+
+
+class MinimizerIndex:
+    """ Positions of the (w, k) minimizers of a genome, roughly 2 / (w + 1) of all kmer positions
+    Stored as a sorted array of minimizer codes, offsets into a position array, and the positions themselves
+
+    Parameters
+    ----------
+    genome : Genome
+        Genome to index
+    k : int, optional default 15
+        Length of kmers
+    w : int, optional default 10
+        Number of consecutive kmers each minimizer is chosen from
+    build : bool, optional default True
+        Whether to index *genome* now, *load* creates an empty index and fills in the saved arrays
+
+    Attributes
+    ----------
+    codes : array
+        Sorted distinct minimizer codes
+    offsets : array
+        Positions of codes[i] are positions[offsets[i]: offsets[i + 1]]
+    positions : array
+        Start index of every minimizer in the genome, grouped by code
+    """
+
+    def __init__(self, genome: Genome, k=15, w=10, build=True):
+        if not 0 < k <= 32 or w < 1:
+            raise ValueError("Minimizer index requires 0 < k <= 32 and w > 0")
+        self.genome = genome
+        self.k = k
+        self.w = w
+        self.codes = array('Q')
+        self.offsets = array('Q', [0])
+        self.positions = array('I')
+        if build:
+            self._build()
+
+    def _build(self):
+        pairs = sorted((code, position) for position, code in minimizers(self.genome.sequence, self.k, self.w))
+        for code, position in pairs:
+            if not self.codes or self.codes[-1] != code:
+                self.codes.append(code)
+                self.offsets.append(self.offsets[-1])
+            self.positions.append(position)
+            self.offsets[-1] += 1
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def nbytes(self) -> int:
+        """ Memory used by the index arrays in bytes """
+        return sum(a.itemsize * len(a) for a in (self.codes, self.offsets, self.positions))
+
+    def get_positions(self, code: int) -> array:
+        """ Positions of a minimizer in the genome
+
+        Parameters
+        ----------
+        code : int
+            Kmer code of the minimizer, see *DNA.pattern_to_number*
+
+        Returns
+        -------
+        array
+            Start indices of the minimizer, empty if it is not in the index
+        """
+        i = bisect_left(self.codes, code)
+        if i == len(self.codes) or self.codes[i] != code:
+            return array('I')
+        return self.positions[self.offsets[i]: self.offsets[i + 1]]
+
+    def candidates(self, query: str) -> List[int]:
+        """ Loci where *query* may occur, from where its minimizers occur in the genome
+        Every exact occurrence is a candidate, approximate occurrences only if they share a minimizer with *query*
+
+        Parameters
+        ----------
+        query : str
+            Pattern of at least k + w - 1 nucleotides
+
+        Returns
+        -------
+        list
+            Sorted candidate start indices
+        """
+        if len(query) < self.k + self.w - 1:
+            raise ValueError(f'Query must be at least k + w - 1 = {self.k + self.w - 1} long to contain a minimizer')
+        last_start = len(self.genome.sequence) - len(query)
+        loci = set()
+        for query_position, code in minimizers(query, self.k, self.w):
+            for position in self.get_positions(code):
+                start = position - query_position
+                if 0 <= start <= last_start:
+                    loci.add(start)
+        return sorted(loci)
+
+    def pattern_match_index(self, pattern: str, max_distance=0) -> List[int]:
+        """ Like *Genome.pattern_match_index*, only checking the candidate loci of *pattern*
+
+        Parameters
+        ----------
+        pattern : str
+            The pattern whose indices we wish to find
+        max_distance : int, optional default 0
+            Maximum allowable hamming distance from *pattern* to count as a match
+
+        Returns
+        -------
+        list
+            Start indices of verified matches
+        """
+        sequence = self.genome.sequence
+        m = len(pattern)
+        return [i for i in self.candidates(pattern) if hamming_distance(sequence[i: i + m], pattern) <= max_distance]
+
+    def save(self, file_path: str):
+        """ Save the index to a binary file
+
+        Parameters
+        ----------
+        file_path : str
+            Where to save the index
+        """
+        with open(file_path, 'wb') as outfile:
+            outfile.write(_HEADER.pack(_MAGIC, self.k, self.w, len(self.genome.sequence),
+                                       zlib.crc32(self.genome.sequence.encode()), len(self.codes), len(self.positions)))
+            self.codes.tofile(outfile)
+            self.offsets.tofile(outfile)
+            self.positions.tofile(outfile)
+
+    @classmethod
+    def load(cls, file_path: str, genome: Genome) -> 'MinimizerIndex':
+        """ Load an index saved with *save*, *genome* must be the genome that was indexed (same length and checksum)
+
+        Parameters
+        ----------
+        file_path : str
+            File the index was saved to
+        genome : Genome
+            The genome that was indexed, used to verify matches
+
+        Returns
+        -------
+        MinimizerIndex
+            The saved index
+        """
+        with open(file_path, 'rb') as infile:
+            header = infile.read(_HEADER.size)
+            if len(header) < _HEADER.size or header[:4] != _MAGIC:
+                raise ValueError(f'{file_path} is not a minimizer index')
+            _, k, w, length, checksum, num_codes, num_positions = _HEADER.unpack(header)
+            if length != len(genome.sequence):
+                raise ValueError("Index was built for a genome of a different length")
+            if checksum != zlib.crc32(genome.sequence.encode()):
+                raise ValueError("Index was built for a different genome of the same length")
+            index = cls(genome, k, w, build=False)
+            index.codes.fromfile(infile, num_codes)
+            index.offsets = array('Q')
+            index.offsets.fromfile(infile, num_codes + 1)
+            index.positions.fromfile(infile, num_positions)
+        return index
@@ -1,10 +1,11 @@
 from collections import Counter
 from itertools import product, chain
-from random import randint, sample
+from random import getstate, randint, sample, setstate
 from typing import Dict, List, Union
 
-from numpy.random import choice
-
+from . import backends
+from .checkpoint import Checkpoint
+from .convergence import ConvergenceMonitor
 from .distance import hamming_distance
 from .dna import DNA
 
@@ -24,11 +25,14 @@ class Motifs(DNA):
     ----------
     strands : list
         All given DNA strands, should be of the same length
+    search_report : dict or None
+        Restarts, iterations and seconds used by the last randomized search, see *ConvergenceMonitor.report*
     """
 
     def __init__(self, dna_strands: Union[List[str], str], separator=' '):
         # TODO check if strands are the same length
         self.strands = dna_strands.split(separator) if isinstance(dna_strands, str) else dna_strands
+        self.search_report = None
 
     def median_string(self, k: int) -> List[str]:
         """ Find kmers minimizing hamming distance amongst all dna strands
@@ -184,6 +188,12 @@ class Motifs(DNA):
         list
             List of probabilities - index of probability corresponds to start index of kmer
         """
+        return backends.build_kmer_probabilities(sequence, probability_profile, k)
+
+    @staticmethod
+    def _reference_build_kmer_probabilities(sequence: str, probability_profile: Dict[str, List[float]],
+                                            k: int) -> list:
+        """ Pure Python *_build_kmer_probabilities*, the reference for the backends """
         probabilities = []
         for i in range(len(sequence) - k + 1):
             kmer = sequence[i: i + k]
@@ -284,15 +294,24 @@ class Motifs(DNA):
                 best_distance = distance
         return best_motifs
 
-    def randomized_motif_search(self, k: int, iterations=1000):
+    def randomized_motif_search(self, k: int, iterations=1000, patience: int = None, confidence: float = None,
+                                time_budget: float = None):
         """ Randomly select kmers from each strand, create profile, and calculate the best score over many iterations
+        Each iteration is an independent restart, so the search can stop early once they stop finding anything better,
+        see *ConvergenceMonitor*. The work actually done is stored in *search_report*
 
         Parameters
         ----------
         k : int
             length of motif
         iterations : int optional default 1000
-            number of times to run algorithm
+            maximum number of times to run algorithm
+        patience : int, optional
+            stop after this many iterations without improving the best score
+        confidence : float, optional
+            stop once the estimated chance that more iterations end with a new score is below 1 - confidence
+        time_budget : float, optional
+            stop after this many seconds
 
         Returns
         -------
@@ -303,6 +322,8 @@ class Motifs(DNA):
         num_possible_kmers = len(self.strands[0]) - k + 1  # assume all strands are the same length, TODO fix or check
         best_overall_motifs = []
         best_overall_distance = max_distance
+        monitor = ConvergenceMonitor(patience, confidence, time_budget)
+        monitor.start()
 
         for _ in range(iterations):
             kmer_starts = sample(range(num_possible_kmers), len(self.strands))
@@ -326,12 +347,21 @@ class Motifs(DNA):
                 best_overall_distance = best_iter_distance
                 best_overall_motifs = best_iter_motifs
 
+            monitor.iteration()
+            if monitor.restart(best_iter_distance):  # also True once out of time
+                break
+
+        self.search_report = monitor.report()
         return best_overall_motifs
 
     #TODO consider refactor - too much duplicate code from randomized_motif_search
-    def gibbs_sampler(self, k: int, restarts=20, iterations=1000):
+    def gibbs_sampler(self, k: int, restarts=20, iterations=1000, checkpoint: Checkpoint = None,
+                      patience: int = None, confidence: float = None, time_budget: float = None,
+                      iteration_patience: int = None):
         """ Randomly select kmers from each strand, create profile, and calculate the best score,
          only changing 1 kmer between iterations
+        Can stop early once restarts stop finding anything better, see *ConvergenceMonitor*.
+        The work actually done is stored in *search_report*
 
         Parameters
         ----------
@@ -341,27 +371,63 @@ class Motifs(DNA):
             number of times we want to try  with different initial random kmers
         iterations : int optional default 1000
             number of times to run algorithm for each random set of kmers
-
+        checkpoint : Checkpoint, optional
+            Periodically save progress (including random number generator states) here. If the checkpoint exists
+            the search resumes from it and gives the same result as an uninterrupted run, it is removed when done
+        patience : int, optional
+            stop after this many restarts without improving the best score
+        confidence : float, optional
+            stop once the estimated chance that more restarts end with a new score is below 1 - confidence
+        time_budget : float, optional
+            stop after this many seconds, including those spent before resuming from *checkpoint*
+        iteration_patience : int, optional
+            end a restart after this many iterations without improving its best score
 
         Returns
         -------
         list
             list of strings making up best motif
         """
+        from numpy import random as numpy_random  # only numpy dependency, imported here so importing stays fast
+
         num_strands = len(self.strands)
         max_distance = num_strands * k
         num_possible_kmers = len(self.strands[0]) - k + 1  # assume all strands are the same length, TODO fix or check
         best_overall_motifs = []
         best_overall_distance = max_distance
 
-        for _ in range(restarts):
-            kmer_starts = sample(range(num_possible_kmers), num_strands)
-
-            best_iter_motifs = [strand[kmer_starts[i]: kmer_starts[i] + k] for i, strand in enumerate(self.strands)]
-            best_iter_distance = max_distance + 1
-            motifs = best_iter_motifs
-
-            for _ in range(iterations):
+        parameters = {'strands': list(self.strands), 'k': k, 'restarts': restarts, 'iterations': iterations,
+                      'patience': patience, 'confidence': confidence, 'time_budget': time_budget,
+                      'iteration_patience': iteration_patience}
+        state = checkpoint.load('gibbs_sampler', parameters) if checkpoint is not None else None
+        monitor = ConvergenceMonitor(patience, confidence, time_budget)
+        first_restart = 0
+        if state is not None:
+            monitor = state['monitor']
+            first_restart = state['restart']
+            best_overall_motifs = state['best_overall_motifs']
+            best_overall_distance = state['best_overall_distance']
+            setstate(state['random_state'])
+            numpy_random.set_state(state['numpy_random_state'])
+        monitor.start()
+
+        for restart in range(first_restart, restarts):
+            if state is not None and restart == state['restart']:
+                motifs = state['motifs']
+                best_iter_motifs = state['best_iter_motifs']
+                best_iter_distance = state['best_iter_distance']
+                first_iteration = state['iteration']
+                since_improvement = state['since_improvement']
+            else:
+                kmer_starts = sample(range(num_possible_kmers), num_strands)
+
+                best_iter_motifs = [strand[kmer_starts[i]: kmer_starts[i] + k] for i, strand in enumerate(self.strands)]
+                best_iter_distance = max_distance + 1
+                motifs = best_iter_motifs
+                first_iteration = 0
+                since_improvement = 0
+
+            for iteration in range(first_iteration, iterations):
                 exclude_index = randint(0, num_strands - 1)
                 motifs.pop(exclude_index)
                 deleted_strand = self.strands[exclude_index]
@@ -370,7 +436,7 @@ class Motifs(DNA):
                 total_prob = sum(unweighted_probs)
                 probs = [i / total_prob for i in unweighted_probs]
 
-                random_index = choice(range(num_possible_kmers), p=probs)
+                random_index = numpy_random.choice(range(num_possible_kmers), p=probs)
 
                 new_random_kmer = deleted_strand[random_index: random_index + k]
 
@@ -381,9 +447,201 @@ class Motifs(DNA):
                 if distance < best_iter_distance:
                     best_iter_distance = distance
                     best_iter_motifs = motifs
+                    since_improvement = 0
+                else:
+                    since_improvement += 1
+
+                if monitor.iteration() or (iteration_patience is not None and since_improvement >= iteration_patience):
+                    break
+
+                if checkpoint is not None and checkpoint.due():
+                    # saved in one pickle so motifs and best_iter_motifs stay the same list when they are
+                    checkpoint.save({
+                        'kind': 'gibbs_sampler', 'parameters': parameters,
+                        'restart': restart, 'iteration': iteration + 1, 'motifs': motifs,
+                        'since_improvement': since_improvement, 'monitor': monitor,
+                        'best_iter_motifs': best_iter_motifs, 'best_iter_distance': best_iter_distance,
+                        'best_overall_motifs': best_overall_motifs, 'best_overall_distance': best_overall_distance,
+                        'random_state': getstate(), 'numpy_random_state': numpy_random.get_state(),
+                    })
 
             if best_iter_distance < best_overall_distance:
                 best_overall_distance = best_iter_distance
                 best_overall_motifs = best_iter_motifs
 
+            if monitor.restart(best_iter_distance):  # a restart cut short by the time budget still counts
+                break
+
+        if checkpoint is not None:
+            checkpoint.remove()
+        self.search_report = monitor.report()
         return best_overall_motifs
+
+    @classmethod
+    def resume_gibbs_sampler(cls, checkpoint: Checkpoint) -> List[str]:
+        """ Continue a *gibbs_sampler* run from its checkpoint, using the strands and parameters it was started with
+
+        Parameters
+        ----------
+        checkpoint : Checkpoint
+            Checkpoint the run was saving to
+
+        Returns
+        -------
+        list
+            list of strings making up best motif
+        """
+        state = checkpoint.load('gibbs_sampler')
+        if state is None:
+            raise FileNotFoundError(f'No checkpoint at {checkpoint.file_path}')
+        parameters = dict(state['parameters'])
+        return cls(parameters.pop('strands')).gibbs_sampler(checkpoint=checkpoint, **parameters)
+
+    def projection_motif_search(self, k: int, max_distance: int, projection_size: int = None,
+                                projections: int = None, bucket_threshold=3, success_probability=0.95,
+                                processes: int = None, seed: int = None) -> List[str]:
+        """ Find (k, d) motifs by random projection: hash every kmer on a random subset of its positions, and refine
+        the buckets that collect kmers from enough strands into motifs
+
+        Parameters
+        ----------
+        k : int
+            length of motif
+        max_distance : int
+            Maximum number of mutations of the implanted motif
+        projection_size : int, optional
+            Number of positions hashed, defaults to the smallest size for which random kmers average at most one per
+            bucket (4 ** size >= number of kmers), and below k - max_distance as chosen by Buhler and Tompa
+        projections : int, optional
+            number of random projections to try, defaults to enough for the planted bucket to reach *bucket_threshold*
+            strands in at least one projection with probability *success_probability*
+        bucket_threshold : int optional default 3
+            minimum number of strands with a kmer in a bucket for it to be refined
+        success_probability : float, optional default 0.95
+            Used to choose the default number of *projections*
+        processes : int, optional
+            Number of worker processes projections are spread over, 1 runs them in this process
+        seed : int, optional
+            Seed for choosing the projected positions
+
+        Returns
+        -------
+        list
+            list of strings making up best motif
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        from math import ceil, log
+        from random import Random
+
+        if not 0 < k <= 31:
+            raise ValueError("Projection search requires 0 < k <= 31")
+        if any(len(strand) < k for strand in self.strands):
+            raise ValueError("Projection search requires every strand to be at least k long")
+        num_kmers = sum(len(strand) - k + 1 for strand in self.strands)
+        if projection_size is None:
+            # too many positions and mutated copies of the motif rarely share a bucket, too few and random kmers do
+            projection_size = min(k - max_distance - 1, int(ceil(log(max(num_kmers, 2), 4))))
+        projection_size = max(1, min(projection_size, k))
+        if projections is None:
+            projections = _projections_needed(len(self.strands), k, max_distance, projection_size, bucket_threshold,
+                                              success_probability)
+
+        rng = Random(seed)
+        tasks = [(self.strands, k, sorted(rng.sample(range(k), projection_size)), bucket_threshold)
+                 for _ in range(projections)]
+        if processes == 1:
+            results = list(map(_projection_worker, tasks))
+        else:
+            with ProcessPoolExecutor(processes) as executor:
+                results = list(executor.map(_projection_worker, tasks))
+
+        best_distance, best_motifs = len(self.strands) * k + 1, []
+        for distance, motifs in results:
+            if motifs and distance < best_distance:
+                best_distance, best_motifs = distance, motifs
+        return best_motifs
+
+
+def _projections_needed(num_strands: int, k: int, max_distance: int, projection_size: int, bucket_threshold: int,
+                        success_probability: float, max_projections=1000) -> int:
+    """ Number of projections for the planted motif's bucket to collect *bucket_threshold* strands at least once with
+    *success_probability* (Buhler and Tompa), assuming each planted copy has *max_distance* mutations """
+    from math import ceil, comb, log
+
+    # chance a copy hashes with the motif: none of its mutated positions are projected
+    hit = comb(k - max_distance, projection_size) / comb(k, projection_size)
+    # chance at least bucket_threshold of the copies do in one projection
+    enriched = 1 - sum(comb(num_strands, i) * hit ** i * (1 - hit) ** (num_strands - i)
+                       for i in range(min(bucket_threshold, num_strands + 1)))
+    if enriched <= 0:
+        return max_projections
+    if enriched >= 1:
+        return 1
+    return max(1, min(max_projections, int(ceil(log(1 - success_probability) / log(1 - enriched)))))
+
+
+def _projection_worker(args):
+    """ One projection of *Motifs.projection_motif_search*, returns (distance, motifs) of its best bucket """
+    import numpy
+
+    strands, k, positions, bucket_threshold = args
+    encoded, codes, strand_ids, starts = [], [], [], []
+    for strand_id, strand in enumerate(strands):
+        nums = backends.encode_sequence(strand)
+        if nums.size and nums.max() > 3:
+            raise ValueError("Projection search requires strands made only of A, C, G and T")
+        encoded.append(nums)
+        strand_codes = backends.kmer_codes(nums, k)
+        codes.append(strand_codes)
+        strand_ids.append(numpy.full(len(strand_codes), strand_id))
+        starts.append(numpy.arange(len(strand_codes)))
+    codes = numpy.concatenate(codes)
+    # strands as rows of one array, shorter strands padded with 4
+    padded = numpy.full((len(strands), max(len(nums) for nums in encoded)), 4, dtype=numpy.uint8)
+    for row, nums in zip(padded, encoded):
+        row[:len(nums)] = nums
+    strand_ids = numpy.concatenate(strand_ids)
+    starts = numpy.concatenate(starts)
+
+    mask = sum(3 << (2 * (k - 1 - position)) for position in positions)
+    buckets, inverse = numpy.unique(codes & mask, return_inverse=True)
+    # count each strand once per bucket
+    bucket_strands = numpy.unique(inverse * len(strands) + strand_ids) // len(strands)
+    enriched = numpy.flatnonzero(numpy.bincount(bucket_strands, minlength=len(buckets)) >= bucket_threshold)
+
+    best_distance, best_motifs = len(strands) * k + 1, []
+    for bucket in enriched:
+        members = numpy.flatnonzero(inverse == bucket)
+        kmers = [strands[strand_ids[i]][starts[i]: starts[i] + k] for i in members]
+        distance, refined = _refine_motifs(strands, padded, kmers, k)
+        if distance < best_distance:
+            best_distance, best_motifs = distance, refined
+    return best_distance, best_motifs
+
+
+def _refine_motifs(strands: List[str], encoded, motifs: List[str], k: int):
+    """ Repeatedly replace motifs by the most probable kmer of each strand under their profile while the score improves
+    Same steps as *Motifs.randomized_motif_search*, with the kmer probabilities of all strands computed at once
+
+    Returns
+    -------
+    tuple
+        (distance, motifs) of the best motifs found
+    """
+    import numpy
+
+    n = encoded.shape[1] - k + 1
+    profile = Motifs._make_profile(motifs, pseudocount=True)
+    best_distance, best_motifs = len(strands) * k + 1, motifs
+    while True:
+        matrix = numpy.vstack([[profile[nuc] for nuc in 'ACGT'], numpy.zeros(k)])  # padding never matches
+        probabilities = numpy.ones((len(strands), n))
+        for j in range(k):
+            probabilities *= matrix[encoded[:, j: j + n], j]
+        # first most probable kmer of each strand, as in *_most_probable_kmer*
+        motifs = [strand[start: start + k] for strand, start in zip(strands, probabilities.argmax(axis=1).tolist())]
+        profile = Motifs._make_profile(motifs, pseudocount=True)
+        distance = hamming_distance(motifs, Motifs._most_probable_strand(profile))
+        if distance >= best_distance:
+            return best_distance, best_motifs
+        best_distance, best_motifs = distance, motifs
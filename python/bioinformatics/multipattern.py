@@ -0,0 +1,171 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict, deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .distance import hamming_distance
+from .dna import DNA
+
+
+class AhoCorasick:
+    """ Aho-Corasick automaton to find exact occurrences of many patterns in one pass over a text
+
+    Parameters
+    ----------
+    patterns : iterable
+        Patterns to search for, duplicates are ignored
+
+    Attributes
+    ----------
+    patterns : list
+        Distinct patterns, index in this list is the pattern id reported by *search*
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(dict.fromkeys(patterns))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail = [0]
+        self._output: List[List[int]] = [[]]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                raise ValueError("Cannot search for an empty pattern")
+            state = 0
+            for char in pattern:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append(pattern_id)
+
+        # breadth first so a state's failure link is resolved before its children's
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                if state:
+                    fail = self._fail[state]
+                    while fail and char not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def search(self, text: str) -> Iterator[Tuple[int, int]]:
+        """ Find all occurrences of all patterns in *text*
+
+        Parameters
+        ----------
+        text : str
+            Text to search
+
+        Returns
+        -------
+        iterator
+            (start index, pattern id) for every occurrence, ordered by end index
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        patterns = self.patterns
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                yield i - len(patterns[pattern_id]) + 1, pattern_id
+
+
+class KmerLookup:
+    """ Hash lookup of every (approximate) variant of many patterns, possibly of mixed lengths
+    Each window of the text is looked up once per distinct pattern length. Variants only use A, C, G and T, so windows
+    containing any other character are compared to the patterns directly
+
+    Parameters
+    ----------
+    patterns : iterable
+        Patterns to search for
+    max_distance : int, optional default 0
+        Maximum hamming distance from a pattern to count as a match
+    """
+
+    def __init__(self, patterns: Iterable[str], max_distance=0):
+        self.patterns = list(dict.fromkeys(patterns))
+        self.max_distance = max_distance
+        self._lookup: Dict[int, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        self._by_length: Dict[int, List[int]] = defaultdict(list)
+        for pattern_id, pattern in enumerate(self.patterns):
+            self._by_length[len(pattern)].append(pattern_id)
+            for neighbor in DNA._get_neighbors(pattern, max_distance):
+                self._lookup[len(pattern)][neighbor].append(pattern_id)
+
+    def search(self, text: str) -> Iterator[Tuple[int, int]]:
+        """ Find all (approximate) occurrences of all patterns in *text*
+
+        Parameters
+        ----------
+        text : str
+            Text to search
+
+        Returns
+        -------
+        iterator
+            (start index, pattern id) for every occurrence, ordered by start index
+        """
+        lookups = sorted(self._lookup.items())
+        others = [match.start() for match in re.finditer('[^ACGT]', text)] if self.max_distance else []
+        for i in range(len(text)):
+            for length, lookup in lookups:
+                window = text[i: i + length]
+                pattern_ids = lookup.get(window)
+                if not pattern_ids and others and len(window) == length:
+                    j = bisect_left(others, i)
+                    if j < len(others) and others[j] < i + length:
+                        pattern_ids = [pattern_id for pattern_id in self._by_length[length]
+                                       if hamming_distance(window, self.patterns[pattern_id]) <= self.max_distance]
+                if pattern_ids:
+                    for pattern_id in pattern_ids:
+                        yield i, pattern_id
+
+
+def multi_pattern_match_index(sequence: str, patterns: Iterable[str], max_distance=0,
+                              include_reverse_complement=False) -> Dict[str, List[int]]:
+    """ Get start indices of every pattern in one pass over a sequence
+    Exact matching uses Aho-Corasick, approximate matching a lookup of each pattern's neighbors
+
+    Parameters
+    ----------
+    sequence : str
+        String of nucleotides to search
+    patterns : iterable
+        Patterns we want to find
+    max_distance : int, optional default 0
+        Maximum allowable hamming distance from a pattern to count as a match
+    include_reverse_complement : bool, optional default False
+        Also report where the (approximate) reverse complement of a pattern starts
+
+    Returns
+    -------
+    dict
+        Keys are the patterns, values are sorted start indices of their matches
+    """
+    patterns = list(dict.fromkeys(patterns))
+    owners = defaultdict(list)  # searched string -> patterns it is a match for
+    for pattern in patterns:
+        owners[pattern].append(pattern)
+        if include_reverse_complement:
+            reverse_complement = DNA.get_reverse_complement(pattern)
+            if reverse_complement != pattern:
+                owners[reverse_complement].append(pattern)
+
+    searched = list(owners)
+    matcher = AhoCorasick(searched) if max_distance == 0 else KmerLookup(searched, max_distance)
+
+    hits = {pattern: set() for pattern in patterns}
+    for index, searched_id in matcher.search(sequence):
+        for pattern in owners[matcher.patterns[searched_id]]:
+            hits[pattern].add(index)
+    return {pattern: sorted(indices) for pattern, indices in hits.items()}
@@ -0,0 +1,149 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from . import backends
+from .dna import DNA
+
+
+def skew_minima_windows(minima: List[int], sequence_length: int, window=1000,
+                        circular=True) -> List[Tuple[int, int, List[int]]]:
+    """ Group skew minima (see *Genome.minimum_skew*) lying close together and extend each group to a window
+
+    Parameters
+    ----------
+    minima : list
+        Sorted indices of the minimum skew
+    sequence_length : int
+        Length of the genome
+    window : int, optional default 1000
+        Length of the window around a single minimum, minima less than this apart share a window
+    circular : bool, optional default True
+        Whether the genome is circular, as bacterial chromosomes are. Windows then wrap around the ends instead of
+        being clipped: start (and minima grouped with those at the end) may be negative or end past *sequence_length*.
+        Either way a window never covers more than the whole genome
+
+    Returns
+    -------
+    list
+        (start, end, minima in the window) of each candidate window
+    """
+    groups = []
+    for index in minima:
+        if groups and index - groups[-1][-1] < window:
+            groups[-1].append(index)
+        else:
+            groups.append([index])
+    if circular and len(groups) > 1 and groups[0][0] + sequence_length - groups[-1][-1] < window:
+        groups[0] = [index - sequence_length for index in groups.pop()] + groups[0]
+
+    windows = []
+    for group in groups:
+        start = group[0] - window // 2
+        end = group[-1] + window - window // 2
+        if not circular:
+            start, end = max(0, start), min(sequence_length, end)
+        elif end - start >= sequence_length:  # wrapping further would count kmers twice
+            start, end = 0, sequence_length
+        windows.append((start, end, group))
+    return windows
+
+
+def _circular_slice(sequence: str, start: int, end: int) -> str:
+    """ sequence[start: end] of a circular sequence, start may be negative and end past the end """
+    pieces = []
+    position = start
+    while position < end:
+        i = position % len(sequence)
+        piece = sequence[i: i + end - position]
+        pieces.append(piece)
+        position += len(piece)
+    return ''.join(pieces)
+
+
+def reverse_complement_clumps(sequence: str, k: int, L: int, t: int) -> List[str]:
+    """ kmers that, counting occurrences of their reverse complement as well, appear at least *t* times within some
+    *L* long stretch of *sequence*. Meant for short candidate windows
+
+    Parameters
+    ----------
+    sequence : str
+        Nucleotide sequence
+    k : int
+        Length of kmers
+    L : int
+        Length of a clump
+    t : int
+        Minimum number of occurrences in a clump
+
+    Returns
+    -------
+    list
+        Sorted kmers of every clump that occur in *sequence*, in either orientation
+    """
+    positions = defaultdict(list)
+    for i in range(len(sequence) - k + 1):
+        kmer = sequence[i: i + k]
+        positions[min(kmer, DNA.get_reverse_complement(kmer))].append(i)
+
+    clumps = set()
+    for canonical, starts in positions.items():
+        if any(starts[j + t - 1] - starts[j] <= L - k for j in range(len(starts) - t + 1)):
+            for start in starts:
+                clumps.add(sequence[start: start + k])
+    return sorted(clumps)
+
+
+def _window_worker(args) -> dict:
+    start, end, minima, sequence, k, max_distance, L, t = args
+    frequency = backends.get_kmer_counts(sequence, k, True, max_distance)
+    max_count = max(frequency.values()) if frequency else 0
+    return {
+        'start': start,
+        'end': end,
+        'skew_minima': minima,
+        'max_count': max_count,
+        'frequent_kmers': sorted(kmer for kmer, count in frequency.items() if count == max_count),
+        'clumps': reverse_complement_clumps(sequence, k, min(L, len(sequence)), t),
+    }
+
+
+def find_origin(sequence: str, minima: List[int], k=9, max_distance=1, window=1000, L: int = None, t=3,
+                circular=True, processes: int = None) -> List[dict]:
+    """ Look for DnaA boxes in the windows around the skew minima of a genome, see *Genome.find_origin*
+
+    Parameters
+    ----------
+    sequence : str
+        Genome sequence
+    minima : list
+        Indices of the minimum skew of *sequence*
+    k : int, optional default 9
+        Length of the DnaA box
+    max_distance : int, optional default 1
+        Maximum hamming distance of an approximate occurrence
+    window : int, optional default 1000
+        Length of the window searched around each skew minimum
+    L : int, optional
+        Length of a clump, defaults to *window*
+    t : int, optional default 3
+        Minimum number of (exact, either strand) occurrences of a kmer in a clump
+    circular : bool, optional default True
+        Whether windows wrap around the ends of the genome, see *skew_minima_windows*
+    processes : int, optional
+        Number of worker processes windows are spread over, 1 or a single window runs in this process
+
+    Returns
+    -------
+    list
+        dict per candidate window, see *Genome.find_origin*
+    """
+    if not sequence:
+        return []
+    L = window if L is None else L
+    tasks = [(start, end, group, _circular_slice(sequence, start, end), k, max_distance, L, t)
+             for start, end, group in skew_minima_windows(minima, len(sequence), window, circular)]
+    if processes == 1 or len(tasks) < 2:
+        return list(map(_window_worker, tasks))
+    with ProcessPoolExecutor(min(processes or len(tasks), len(tasks))) as executor:
+        return list(executor.map(_window_worker, tasks))
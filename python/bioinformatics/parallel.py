@@ -0,0 +1,138 @@
+import mmap
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from tempfile import mkstemp
+from typing import List, Tuple
+
+from .genome import Genome
+
+_worker_map = None
+
+
+def _init_worker(file_path: str):
+    global _worker_map
+    with open(file_path, 'rb') as infile:
+        _worker_map = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _read(start: int, end: int) -> str:
+    return _worker_map[start:end].decode('ascii')
+
+
+def _pattern_match_index(args) -> List[int]:
+    start, end, pattern, max_distance = args
+    return [start + i for i in Genome(_read(start, end)).pattern_match_index(pattern, max_distance)]
+
+
+def _pattern_count(args) -> int:
+    start, end, pattern, max_distance = args
+    return Genome(_read(start, end)).pattern_count(pattern, max_distance)
+
+
+def _kmer_counts(args) -> Counter:
+    start, end, k, count_reverse_complement, max_distance = args
+    return Genome.get_kmer_counts(_read(start, end), k, count_reverse_complement, max_distance)
+
+
+def _skew(args) -> Tuple[int, int, List[int]]:
+    start, end = args
+    skew = 0
+    min_skew = None
+    min_indices = []
+    for i, nucleotide in enumerate(_read(start, end), start + 1):
+        if nucleotide == 'C':
+            skew -= 1
+        elif nucleotide == 'G':
+            skew += 1
+        if min_skew is None or skew < min_skew:
+            min_skew = skew
+            min_indices = [i]
+        elif skew == min_skew:
+            min_indices.append(i)
+    return skew, min_skew, min_indices
+
+
+class ParallelGenome:
+    """ Run whole genome scans of a Genome in chunks on a process pool
+    The sequence is written once to a temporary file that every worker memory maps, so it is never pickled per task.
+    Chunks overlap by the pattern/kmer length - 1 so results are identical to the single process Genome methods.
+
+    Use as a context manager, or call *close* when done:
+        with ParallelGenome(genome) as parallel:
+            parallel.pattern_match_index('ATGATCAAG')
+
+    Parameters
+    ----------
+    genome : Genome
+        Genome to scan
+    processes : int, optional
+        Number of worker processes, defaults to the number of CPUs
+    chunk_size : int, optional default 1000000
+        Number of window start positions given to each task
+    """
+
+    def __init__(self, genome: Genome, processes: int = None, chunk_size=1000000):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.length = len(genome.sequence)
+        self.chunk_size = chunk_size
+
+        handle, self._file_path = mkstemp(suffix='.seq')
+        with os.fdopen(handle, 'wb') as outfile:
+            outfile.write(genome.sequence.encode('ascii'))
+        self._executor = ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(self._file_path,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """ Shut down the worker pool and remove the temporary sequence file """
+        self._executor.shutdown()
+        if os.path.exists(self._file_path):
+            os.remove(self._file_path)
+
+    def _chunks(self, window: int) -> List[Tuple[int, int]]:
+        """ (start, end) of each chunk so every window of length *window* starts in exactly one chunk """
+        num_windows = self.length - window + 1
+        return [(start, min(start + self.chunk_size, num_windows) + window - 1)
+                for start in range(0, max(num_windows, 0), self.chunk_size)]
+
+    def pattern_count(self, pattern: str, max_distance=0) -> int:
+        """ Parallel *Genome.pattern_count* """
+        tasks = [(start, end, pattern, max_distance) for start, end in self._chunks(len(pattern))]
+        return sum(self._executor.map(_pattern_count, tasks))
+
+    def pattern_match_index(self, pattern: str, max_distance=0) -> List[int]:
+        """ Parallel *Genome.pattern_match_index* """
+        tasks = [(start, end, pattern, max_distance) for start, end in self._chunks(len(pattern))]
+        indices = []
+        for chunk_indices in self._executor.map(_pattern_match_index, tasks):
+            indices.extend(chunk_indices)
+        return indices
+
+    def get_kmer_counts(self, k: int, count_reverse_complement=False, max_distance=0) -> Counter:
+        """ Parallel *Genome.get_kmer_counts* over the whole sequence """
+        tasks = [(start, end, k, count_reverse_complement, max_distance) for start, end in self._chunks(k)]
+        frequency = Counter()
+        for chunk_frequency in self._executor.map(_kmer_counts, tasks):
+            frequency.update(chunk_frequency)
+        return frequency
+
+    def minimum_skew(self) -> List[int]:
+        """ Parallel *Genome.minimum_skew*, each chunk's skew is offset by the total skew of the chunks before it """
+        offset = 0
+        min_skew = 0
+        min_indices = [0]  # skew is 0 before the first nucleotide
+        for delta, chunk_min, chunk_indices in self._executor.map(_skew, self._chunks(1)):
+            if chunk_min is not None:
+                if offset + chunk_min < min_skew:
+                    min_skew = offset + chunk_min
+                    min_indices = list(chunk_indices)
+                elif offset + chunk_min == min_skew:
+                    min_indices.extend(chunk_indices)
+            offset += delta
+        return min_indices
@@ -0,0 +1,181 @@
+import heapq
+from math import log2
+from typing import Dict, Iterator, List, Tuple, Union
+
+import numpy
+
+from .backends import encode_sequence
+from .genome import Genome
+from .motifs import Motifs
+
+_NUCLEOTIDES = 'ACGT'
+
+
+class PositionWeightMatrix:
+    """ Log-odds scores of a motif profile against background nucleotide frequencies, for scanning whole genomes
+
+    Parameters
+    ----------
+    profile : dict
+        Probability profile as from *Motifs._make_profile*, keys are the nucleotides, values are per position probabilities
+    background : dict, optional
+        Frequency of each nucleotide, defaults to uniform, see *background_frequencies*
+    pseudocount : float, optional default 0.01
+        Added to every profile probability (then renormalized) so unseen nucleotides don't score -inf
+
+    Attributes
+    ----------
+    log_odds : numpy.ndarray
+        4xk matrix, row order A, C, G, T, of log2(profile probability / background frequency)
+    """
+
+    def __init__(self, profile: Dict[str, List[float]], background: Dict[str, float] = None, pseudocount=0.01):
+        if background is None:
+            background = {nuc: 0.25 for nuc in _NUCLEOTIDES}
+        self.k = len(profile['A'])
+        self.log_odds = numpy.array([[log2((p + pseudocount) / (1 + 4 * pseudocount) / background[nuc])
+                                      for p in profile[nuc]] for nuc in _NUCLEOTIDES])
+        # reverse strand: position j of the reverse complement is the complement of position k - 1 - j
+        self._reverse_log_odds = self.log_odds[::-1, ::-1].copy()
+
+    @classmethod
+    def from_motifs(cls, motifs: List[str], background: Dict[str, float] = None, pseudocount=0.01,
+                    use_pseudocount=True) -> 'PositionWeightMatrix':
+        """ Build from motifs, e.g. the output of *Motifs.greedy_motif_search* or *Motifs.gibbs_sampler*
+
+        Parameters
+        ----------
+        motifs : list
+            kmers making up the motif
+        background : dict, optional
+            Frequency of each nucleotide, defaults to uniform
+        pseudocount : float, optional default 0.01
+            Added to every profile probability
+        use_pseudocount : bool, optional default True
+            Whether to add 1 to each count when making the profile, as in *Motifs._make_profile*
+
+        Returns
+        -------
+        PositionWeightMatrix
+            Matrix for the motif profile
+        """
+        return cls(Motifs._make_profile(motifs, pseudocount=use_pseudocount), background, pseudocount)
+
+    @staticmethod
+    def background_frequencies(genome: Genome) -> Dict[str, float]:
+        """ Frequency of each nucleotide in a genome, for use as *background*
+
+        Parameters
+        ----------
+        genome : Genome
+            Genome to count nucleotides of
+
+        Returns
+        -------
+        dict
+            Keys are the nucleotides, values are their frequencies
+        """
+        counts = {nuc: genome.sequence.count(nuc) for nuc in _NUCLEOTIDES}
+        total = sum(counts.values()) or 1
+        return {nuc: count / total for nuc, count in counts.items()}
+
+    @property
+    def max_score(self) -> float:
+        return float(self.log_odds.max(axis=0).sum())
+
+    @property
+    def min_score(self) -> float:
+        return float(self.log_odds.min(axis=0).sum())
+
+    def score(self, kmer: str) -> float:
+        """ Log-odds score of a single kmer
+
+        Parameters
+        ----------
+        kmer : str
+            kmer of length k
+
+        Returns
+        -------
+        float
+            Sum of the log-odds of each nucleotide at its position
+        """
+        return float(sum(self.log_odds[_NUCLEOTIDES.index(nuc), j] for j, nuc in enumerate(kmer)))
+
+    def _scores(self, nums: numpy.ndarray, matrix: numpy.ndarray) -> numpy.ndarray:
+        n = len(nums) - self.k + 1
+        padded = numpy.vstack([matrix, numpy.full(self.k, -numpy.inf)])  # windows with other characters never score
+        scores = numpy.zeros(n)
+        for j in range(self.k):
+            scores += padded[nums[j: j + n], j]
+        return scores
+
+    def scan(self, genome: Union[Genome, str], threshold: float, both_strands=True,
+             chunk_size=1000000) -> Iterator[Tuple[int, str, float]]:
+        """ Score every window of a genome and stream those scoring at least *threshold*, chunk by chunk
+
+        Parameters
+        ----------
+        genome : Genome or str
+            Genome or nucleotide sequence to scan
+        threshold : float
+            Minimum log-odds score of a hit, between *min_score* and *max_score*
+        both_strands : bool, optional default True
+            Also score the reverse complement of every window
+        chunk_size : int, optional default 1000000
+            Number of windows scored at a time, bounds memory use
+
+        Returns
+        -------
+        iterator
+            (start index, strand '+' or '-', score) of each hit, ordered by position
+        """
+        for start, forward, reverse in self._chunk_scores(genome, both_strands, chunk_size):
+            hits = [(start + int(i), '+', float(forward[i])) for i in numpy.flatnonzero(forward >= threshold)]
+            if reverse is not None:
+                hits.extend((start + int(i), '-', float(reverse[i])) for i in numpy.flatnonzero(reverse >= threshold))
+                hits.sort()
+            yield from hits
+
+    def top_hits(self, genome: Union[Genome, str], n: int, both_strands=True,
+                 chunk_size=1000000) -> List[Tuple[int, str, float]]:
+        """ The *n* highest scoring windows of a genome, keeping only *n* hits in memory
+
+        Parameters
+        ----------
+        genome : Genome or str
+            Genome or nucleotide sequence to scan
+        n : int
+            Number of hits to return
+        both_strands : bool, optional default True
+            Also score the reverse complement of every window
+        chunk_size : int, optional default 1000000
+            Number of windows scored at a time
+
+        Returns
+        -------
+        list
+            (start index, strand, score) sorted from highest to lowest score
+        """
+        best: List[Tuple[float, int, str]] = []
+        for start, forward, reverse in self._chunk_scores(genome, both_strands, chunk_size):
+            for strand, scores in (('+', forward), ('-', reverse)):
+                if scores is None or not len(scores):
+                    continue
+                candidates = numpy.argpartition(-scores, min(n, len(scores)) - 1)[:n]
+                for i in candidates:
+                    hit = (float(scores[i]), -(start + int(i)), strand)  # ties go to the earlier position
+                    if len(best) < n:
+                        heapq.heappush(best, hit)
+                    elif hit > best[0]:
+                        heapq.heapreplace(best, hit)
+        return [(-position, strand, score) for score, position, strand in sorted(best, reverse=True)]
+
+    def _chunk_scores(self, genome: Union[Genome, str], both_strands: bool, chunk_size: int):
+        sequence = genome.sequence if isinstance(genome, Genome) else genome
+        num_windows = len(sequence) - self.k + 1
+        for start in range(0, max(num_windows, 0), chunk_size):
+            chunk = sequence[start: min(start + chunk_size, num_windows) + self.k - 1]
+            nums = encode_sequence(chunk)
+            reverse = self._scores(nums, self._reverse_log_odds) if both_strands else None
+            yield start, self._scores(nums, self.log_odds), reverse
@@ -0,0 +1,311 @@
+from collections import Counter, defaultdict, deque
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+from .bgzf import open_text_file
+from .dna import DNA
+from .genome import Genome
+
+_SKEW_STEP = {'C': -1, 'G': 1}
+
+
+class _Skew:
+    """ *Genome.minimum_skew* """
+    k = None
+
+    def __init__(self):
+        self.skew = 0
+        self.min_skew = 0
+        self.min_indices = [0]
+
+    def consume(self, offset: int, chunk: str, composition: Counter, codes: List[Tuple[int, int]]):
+        steps = list(accumulate((_SKEW_STEP.get(nuc, 0) for nuc in chunk), initial=self.skew))
+        chunk_min = min(steps)
+        if chunk_min < self.min_skew:
+            self.min_skew = chunk_min
+            self.min_indices = []
+        if chunk_min == self.min_skew:
+            self.min_indices.extend(offset + i for i, value in enumerate(steps) if i and value == chunk_min)
+        self.skew = steps[-1]
+
+    def result(self) -> List[int]:
+        return self.min_indices
+
+
+class _Composition:
+    """ Number of times each character occurs """
+    k = None
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def consume(self, offset: int, chunk: str, composition: Counter, codes: List[Tuple[int, int]]):
+        self.counts.update(composition)
+
+    def result(self) -> Counter:
+        return self.counts
+
+
+class _KmerCounts:
+    """ *Genome.get_kmer_counts*, exact counts are kept as codes and expanded to neighbors and reverse complements
+    once at the end """
+
+    def __init__(self, k: int, count_reverse_complement: bool, max_distance: int):
+        self.k = k
+        self.count_reverse_complement = count_reverse_complement
+        self.max_distance = max_distance
+        self.counts = Counter()
+
+    def consume(self, offset: int, chunk: str, composition: Counter, codes: List[Tuple[int, int]]):
+        self.counts.update(code for _, code in codes)
+
+    def result(self) -> Counter:
+        frequency = Counter()
+        for code, count in self.counts.items():
+            for neighbor in DNA._get_neighbors(DNA.number_to_pattern(code, self.k), self.max_distance):
+                frequency[neighbor] += count
+        if self.count_reverse_complement:
+            frequency.update(Counter({DNA.get_reverse_complement(kmer): count for kmer, count in frequency.items()}))
+        return frequency
+
+
+class _PatternMatches:
+    """ *Genome.pattern_match_index* for several patterns of the same length, an occurrence is a kmer whose code is
+    in the (approximate) neighborhood of a pattern """
+
+    def __init__(self, patterns: List[str], max_distance: int):
+        self.k = len(patterns[0])
+        self.lookup: Dict[int, List[str]] = defaultdict(list)
+        for pattern in dict.fromkeys(patterns):
+            for neighbor in DNA._get_neighbors(pattern, max_distance):
+                self.lookup[DNA.pattern_to_number(neighbor)].append(pattern)
+        self.indices = {pattern: [] for pattern in patterns}
+
+    def consume(self, offset: int, chunk: str, composition: Counter, codes: List[Tuple[int, int]]):
+        lookup = self.lookup
+        for i, code in codes:
+            if code in lookup:
+                for pattern in lookup[code]:
+                    self.indices[pattern].append(i)
+
+    def result(self) -> Dict[str, List[int]]:
+        return self.indices
+
+
+class _Clumps:
+    """ *Genome.find_clumps*: a kmer forms a clump when t of its occurrences start at most L - k apart """
+
+    def __init__(self, k: int, L: int, t: int):
+        self.k = k
+        self.span = L - k
+        self.t = t
+        self.recent: Dict[int, deque] = {}  # start of the last t - 1 occurrences of each kmer
+        self.clumps = set()
+
+    def consume(self, offset: int, chunk: str, composition: Counter, codes: List[Tuple[int, int]]):
+        t, span, recent, clumps = self.t, self.span, self.recent, self.clumps
+        for i, code in codes:
+            if code in clumps:
+                continue
+            starts = recent.get(code)
+            if starts is None:
+                starts = recent[code] = deque(maxlen=max(t - 1, 1))
+            if t <= 1 or (len(starts) == t - 1 and i - starts[0] <= span):
+                clumps.add(code)
+                del recent[code]
+            else:
+                starts.append(i)
+
+    def result(self) -> List[str]:
+        return [DNA.number_to_pattern(code, self.k) for code in self.clumps]
+
+
+class ScanPlan:
+    """ Register several whole genome analyses, then run them all in a single streaming pass over the sequence
+    Each chunk of the sequence is read once. Its character composition and the rolling kmer codes (see
+    *DNA.indexed_kmer_codes*) for each kmer length are computed once and shared by every analysis that needs them.
+    Chunks overlap by k - 1 so results are the same as the corresponding *Genome* methods, except that kmers
+    containing a character other than A, C, G or T are never counted or matched.
+
+    e.g. ScanPlan().skew().kmer_counts(9, count_reverse_complement=True).pattern_matches(['ATGATCAAG']).run(genome)
+
+    Every method adding an analysis takes an optional *name*, the key of its result in the output of *run*
+    """
+
+    def __init__(self):
+        self.analyses = {}
+
+    def _add(self, name: str, analysis) -> 'ScanPlan':
+        if name in self.analyses:
+            raise ValueError(f'An analysis named {name} is already in the plan')
+        self.analyses[name] = analysis
+        return self
+
+    def skew(self, name='skew') -> 'ScanPlan':
+        """ Indices with the minimum skew, see *Genome.minimum_skew* """
+        return self._add(name, _Skew())
+
+    def composition(self, name='composition') -> 'ScanPlan':
+        """ Counter of how many times each character occurs """
+        return self._add(name, _Composition())
+
+    def kmer_counts(self, k: int, count_reverse_complement=False, max_distance=0, name: str = None) -> 'ScanPlan':
+        """ Counter of how many times each kmer occurs, see *Genome.get_kmer_counts*
+
+        Parameters
+        ----------
+        k : int
+            Length of kmers to get counts of
+        count_reverse_complement : bool, optional default False
+            Whether we also want to add occurrences of the (approximate) reverse complement to our frequency
+        max_distance : int, optional default 0
+            Maximum hamming distance from a pattern to count as a match
+        name : str, optional
+            Defaults to 'kmer_counts_{k}'
+        """
+        return self._add(name or f'kmer_counts_{k}', _KmerCounts(k, count_reverse_complement, max_distance))
+
+    def pattern_matches(self, patterns: Union[List[str], str], max_distance=0, name: str = None) -> 'ScanPlan':
+        """ Start indices of every (approximate) occurrence of each pattern, see *Genome.pattern_match_index*
+
+        Parameters
+        ----------
+        patterns : list or str
+            Patterns of nucleotides, patterns of the same length share a kmer code stream
+        max_distance : int, optional default 0
+            Maximum allowable hamming distance from a pattern to count as a match
+        name : str, optional
+            Defaults to 'pattern_matches' followed by a number if needed to be unique. The result is a dict of
+            pattern to sorted indices
+        """
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        if not patterns or not all(patterns) or any(set(pattern) - set(DNA.nucleobases) for pattern in patterns):
+            raise ValueError('Patterns must be non empty strings of A, C, G and T')
+        if name is None:
+            name, number = 'pattern_matches', 1
+            while name in self.analyses:
+                number += 1
+                name = f'pattern_matches_{number}'
+        by_length = defaultdict(list)
+        for pattern in patterns:
+            by_length[len(pattern)].append(pattern)
+        return self._add(name, [_PatternMatches(group, max_distance) for group in by_length.values()])
+
+    def clumps(self, k: int, L: int, t: int, name: str = None) -> 'ScanPlan':
+        """ kmers appearing at least *t* times in some window of length *L*, see *Genome.find_clumps*
+
+        Parameters
+        ----------
+        k : int
+            Length of each kmer to check
+        L : int
+            Length of a clump to search in
+        t : int
+            Minimum number of times a kmer must appear to be considered
+        name : str, optional
+            Defaults to 'clumps_{k}_{L}_{t}'
+        """
+        return self._add(name or f'clumps_{k}_{L}_{t}', _Clumps(k, L, t))
+
+    def _consumers(self) -> list:
+        consumers = []
+        for analysis in self.analyses.values():
+            consumers.extend(analysis if isinstance(analysis, list) else [analysis])
+        return consumers
+
+    def run_chunks(self, chunks: Iterable[str]) -> Dict[str, object]:
+        """ Run every analysis over consecutive pieces of a sequence, e.g. from *StrandView.chunks*
+
+        Parameters
+        ----------
+        chunks : iterable
+            Consecutive pieces of the sequence, read once
+
+        Returns
+        -------
+        dict
+            Keys are the analysis names, values their results
+        """
+        consumers = self._consumers()
+        lengths = sorted({consumer.k for consumer in consumers if consumer.k is not None})
+        need_composition = any(isinstance(consumer, _Composition) for consumer in consumers)
+        overlap = max(lengths, default=1) - 1
+        tail = ''
+        offset = 0
+        for chunk in chunks:
+            if not chunk:
+                continue
+            composition = Counter(chunk) if need_composition else None
+            window = tail + chunk
+            window_start = offset - len(tail)
+            # only kmers ending in this chunk, those ending in the tail were produced with the previous chunk
+            codes = {k: [(window_start + i, code) for i, code in DNA.indexed_kmer_codes(window, k)
+                         if i + k > len(tail)]
+                     for k in lengths}
+            for consumer in consumers:
+                consumer.consume(offset, chunk, composition, codes.get(consumer.k))
+            offset += len(chunk)
+            tail = window[max(0, len(window) - overlap):] if overlap else ''
+
+        results = {}
+        for name, analysis in self.analyses.items():
+            if isinstance(analysis, list):
+                results[name] = {pattern: indices for group in analysis for pattern, indices in group.result().items()}
+            else:
+                results[name] = analysis.result()
+        return results
+
+    def run(self, genome: Union[Genome, str], chunk_size=100000) -> Dict[str, object]:
+        """ Run every analysis over a genome in one pass
+
+        Parameters
+        ----------
+        genome : Genome or str
+            Genome or nucleotide sequence
+        chunk_size : int, optional default 100000
+            Number of nucleotides processed at a time, bounds the memory used by the shared kmer code streams
+
+        Returns
+        -------
+        dict
+            Keys are the analysis names, values their results
+        """
+        sequence = genome.sequence if isinstance(genome, Genome) else genome
+        return self.run_chunks(sequence[start: start + chunk_size] for start in range(0, len(sequence), chunk_size))
+
+    def run_file(self, file_path: str, skip_header_rows=0, chunk_size=100000) -> Dict[str, object]:
+        """ Run every analysis while reading a genome file, without ever holding the whole sequence in memory
+        The file is read once, see *Genome.read_genome* for the formats
+
+        Parameters
+        ----------
+        file_path : str
+            Genome file, plain text, gzip or BGZF compressed
+        skip_header_rows : int, optional default 0
+            Do not read in the first n lines of file
+        chunk_size : int, optional default 100000
+            Approximate number of nucleotides processed at a time
+
+        Returns
+        -------
+        dict
+            Keys are the analysis names, values their results
+        """
+        return self.run_chunks(self._file_chunks(file_path, skip_header_rows, chunk_size))
+
+    @staticmethod
+    def _file_chunks(file_path: str, skip_header_rows: int, chunk_size: int) -> Iterator[str]:
+        with open_text_file(file_path) as infile:
+            for _ in range(skip_header_rows):
+                infile.readline()
+            pieces, size = [], 0
+            for line in infile:
+                line = line.rstrip('\r\n')
+                pieces.append(line)
+                size += len(line)
+                if size >= chunk_size:
+                    yield ''.join(pieces)
+                    pieces, size = [], 0
+            if pieces:
+                yield ''.join(pieces)
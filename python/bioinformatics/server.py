@@ -0,0 +1,368 @@
+import asyncio
+import json
+import time
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from .genome import Genome
+from .motifs import Motifs
+
+_worker_genomes: Dict[str, Genome] = {}
+_worker_motifs: Dict[str, Motifs] = {}
+
+
+def _init_worker(genomes: Dict[str, Genome], motifs: Dict[str, Motifs]):
+    global _worker_genomes, _worker_motifs
+    _worker_genomes = genomes
+    _worker_motifs = motifs
+
+
+def _genome(params: dict) -> Genome:
+    return _worker_genomes[params['genome']]
+
+
+def _pattern_count(params: dict) -> int:
+    return _genome(params).pattern_count(params['pattern'], params['max_distance'])
+
+
+def _pattern_match(params: dict) -> List[int]:
+    return _genome(params).pattern_match_index(params['pattern'], params['max_distance'])
+
+
+def _kmer_frequency(params: dict) -> list:
+    frequency = Genome.get_kmer_counts(_genome(params).sequence, params['k'], params['count_reverse_complement'],
+                                       params['max_distance'])
+    if params['pattern'] is not None:
+        return [[params['pattern'], frequency[params['pattern']]]]
+    return [list(item) for item in frequency.most_common(params['top'])]
+
+
+def _skew(params: dict) -> List[int]:
+    return _genome(params).minimum_skew()
+
+
+def _motif_search(params: dict) -> List[str]:
+    motifs = _worker_motifs[params['motifs']]
+    k = params['k']
+    method = params['method']
+    if method == 'greedy':
+        return motifs.greedy_motif_search(k, use_pseudocount=params['use_pseudocount'])
+    if method == 'randomized':
+        return motifs.randomized_motif_search(k, params['iterations'])
+    if method == 'gibbs':
+        return motifs.gibbs_sampler(k, params['restarts'], params['iterations'])
+    return motifs.median_string(k)
+
+
+def _as_bool(value: Union[str, bool]) -> bool:
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ('1', 'true', 'yes'):
+        return True
+    if str(value).lower() in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f'{value!r} is not a boolean')
+
+
+def _motif_method(value: str) -> str:
+    if value not in ('greedy', 'randomized', 'gibbs', 'median'):
+        raise ValueError(f'Unknown motif search method {value}')
+    return value
+
+
+ENDPOINTS = {
+    '/pattern_count': _pattern_count,
+    '/pattern_match': _pattern_match,
+    '/kmer_frequency': _kmer_frequency,
+    '/skew': _skew,
+    '/motif_search': _motif_search,
+}
+
+_REQUIRED = object()
+# parameters of each endpoint as name: (conversion, default), values from query strings arrive as strings
+PARAMETERS = {
+    '/pattern_count': {'genome': (str, _REQUIRED), 'pattern': (str, _REQUIRED), 'max_distance': (int, 0)},
+    '/pattern_match': {'genome': (str, _REQUIRED), 'pattern': (str, _REQUIRED), 'max_distance': (int, 0)},
+    '/kmer_frequency': {'genome': (str, _REQUIRED), 'k': (int, _REQUIRED),
+                        'count_reverse_complement': (_as_bool, False), 'max_distance': (int, 0), 'top': (int, 10),
+                        'pattern': (str, None)},
+    '/skew': {'genome': (str, _REQUIRED)},
+    '/motif_search': {'motifs': (str, _REQUIRED), 'k': (int, _REQUIRED), 'method': (_motif_method, 'greedy'),
+                      'use_pseudocount': (_as_bool, True), 'iterations': (int, 1000), 'restarts': (int, 20)},
+}
+
+
+def _normalize_params(endpoint: str, params: dict) -> dict:
+    """ Convert every parameter to its type and fill in defaults, so equivalent queries such as k=1 and k='1' look
+    the same. Raises ValueError for missing, unknown or malformed parameters """
+    expected = PARAMETERS[endpoint]
+    unknown = sorted(set(params) - set(expected))
+    if unknown:
+        raise ValueError(f'Unknown parameter {", ".join(unknown)} for {endpoint}')
+    normalized = {}
+    for name, (convert, default) in expected.items():
+        if name not in params:
+            if default is _REQUIRED:
+                raise ValueError(f'Missing parameter {name} for {endpoint}')
+            normalized[name] = default
+            continue
+        try:
+            normalized[name] = convert(params[name])
+        except (TypeError, ValueError) as error:
+            raise ValueError(f'Invalid value for {name}: {error}') from None
+    return normalized
+
+
+def _run(endpoint: str, params: dict) -> bytes:
+    # serialized in the worker, large results never tie up the event loop
+    return json.dumps(ENDPOINTS[endpoint](params)).encode()
+
+
+def _ready() -> bool:
+    return True
+
+
+class _EndpointMetrics:
+    """ Latency of the most recent requests to an endpoint """
+
+    def __init__(self, window=1000):
+        self.requests = 0
+        self.errors = 0
+        self.coalesced = 0
+        self.total_seconds = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, seconds: float, error=False, coalesced=False):
+        self.requests += 1
+        self.errors += error
+        self.coalesced += coalesced
+        self.total_seconds += seconds
+        self.latencies.append(seconds)
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            return latencies[min(int(fraction * len(latencies)), len(latencies) - 1)] if latencies else 0.0
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'coalesced': self.coalesced,
+            'mean_seconds': self.total_seconds / self.requests if self.requests else 0.0,
+            'p50_seconds': percentile(0.5),
+            'p95_seconds': percentile(0.95),
+            'max_seconds': latencies[-1] if latencies else 0.0,
+        }
+
+
+class GenomeServer:
+    """ Local HTTP server answering queries against genomes and motifs loaded once
+    CPU bound queries run on a process pool whose workers receive the data once at startup, so the event loop never
+    blocks, and results are serialized to JSON there too. Identical requests (after converting parameters to their
+    types, so k=1 and k='1' are the same) that arrive while one is already running share its result.
+
+    Endpoints take parameters from the query string or a JSON body and return JSON:
+        /pattern_count, /pattern_match    genome, pattern, max_distance
+        /kmer_frequency                   genome, k, count_reverse_complement, max_distance, top or pattern
+        /skew                             genome
+        /motif_search                     motifs, k, method (greedy, randomized, gibbs, median) and its parameters
+        /metrics                          per endpoint request counts and latencies
+    Missing, unknown or malformed parameters and unknown genome or motifs names are answered with 400 and a message
+
+    Parameters
+    ----------
+    genomes : dict, optional
+        Keys are names used in requests, values are Genome objects
+    motifs : dict, optional
+        Keys are names used in requests, values are Motifs objects
+    host : str, optional default '127.0.0.1'
+        Address to listen on
+    port : int, optional default 8000
+        Port to listen on, 0 picks a free port
+    unix_socket : str, optional
+        Listen on this Unix socket path instead of *host* and *port*
+    processes : int, optional
+        Number of worker processes, defaults to the number of CPUs
+    """
+
+    def __init__(self, genomes: Dict[str, Genome] = None, motifs: Dict[str, Motifs] = None, host='127.0.0.1',
+                 port=8000, unix_socket: str = None, processes: int = None):
+        self.genomes = genomes or {}
+        self.motifs = motifs or {}
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.processes = processes
+        self.metrics = {endpoint: _EndpointMetrics() for endpoint in ENDPOINTS}
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+        self._executor = None
+        self._server = None
+
+    async def start(self):
+        """ Start the worker pool and begin listening """
+        self._executor = ProcessPoolExecutor(self.processes, initializer=_init_worker,
+                                             initargs=(self.genomes, self.motifs))
+        # start the workers before listening, forked workers would otherwise inherit open client connections
+        await asyncio.get_running_loop().run_in_executor(self._executor, _ready)
+        if self.unix_socket:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.unix_socket)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """ Start if needed and serve until cancelled """
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """ Stop listening and shut down the worker pool """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    async def query(self, endpoint: str, params: dict):
+        """ Answer a query as the HTTP endpoint would, sharing the result with identical queries in flight
+
+        Parameters
+        ----------
+        endpoint : str
+            e.g. '/pattern_count'
+        params : dict
+            Parameters of the query
+
+        Returns
+        -------
+        Result of the query, JSON serializable
+        """
+        return json.loads(await self.query_json(endpoint, params))
+
+    async def query_json(self, endpoint: str, params: dict) -> bytes:
+        """ *query* returning the result already serialized as JSON """
+        if endpoint not in ENDPOINTS:
+            raise LookupError(f'Unknown endpoint {endpoint}')
+        start = time.perf_counter()
+        try:
+            params = self._check_params(endpoint, params)
+        except ValueError:
+            self.metrics[endpoint].record(time.perf_counter() - start, error=True)
+            raise
+        key = (endpoint, json.dumps(params, sort_keys=True))
+        future = self._in_flight.get(key)
+        coalesced = future is not None
+        if not coalesced:
+            loop = asyncio.get_running_loop()
+            future = asyncio.ensure_future(loop.run_in_executor(self._executor, _run, endpoint, params))
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            self._in_flight[key] = future
+        try:
+            result = await asyncio.shield(future)  # one client disconnecting must not cancel it for the others
+        except Exception:
+            self.metrics[endpoint].record(time.perf_counter() - start, error=True, coalesced=coalesced)
+            raise
+        self.metrics[endpoint].record(time.perf_counter() - start, coalesced=coalesced)
+        return result
+
+    def _check_params(self, endpoint: str, params: dict) -> dict:
+        params = _normalize_params(endpoint, params)
+        if 'genome' in params and params['genome'] not in self.genomes:
+            raise ValueError(f'Unknown genome {params["genome"]}')
+        if 'motifs' in params and params['motifs'] not in self.motifs:
+            raise ValueError(f'Unknown motifs {params["motifs"]}')
+        return params
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                _, target, version = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, data = await self._respond(target, body)
+                keep_alive = headers.get('connection', '').lower() != 'close' and version.strip() == 'HTTP/1.1'
+                writer.write(f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\n'
+                             f'Content-Length: {len(data)}\r\n'
+                             f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, target: str, body: bytes):
+        """ Status and JSON body of the response to a request """
+        url = urlsplit(target)
+        if url.path == '/metrics':
+            summary = {endpoint: metrics.summary() for endpoint, metrics in self.metrics.items()}
+            return '200 OK', json.dumps(summary).encode()
+        if url.path not in ENDPOINTS:
+            return '404 Not Found', json.dumps({'error': f'Unknown endpoint {url.path}'}).encode()
+        try:
+            params = dict(parse_qsl(url.query))
+            if body:
+                body = json.loads(body)
+                if not isinstance(body, dict):
+                    raise ValueError('Request body must be a JSON object')
+                params.update(body)
+            return '200 OK', b'{"result": ' + await self.query_json(url.path, params) + b'}'
+        except ValueError as error:  # includes malformed JSON bodies
+            return '400 Bad Request', json.dumps({'error': str(error)}).encode()
+        except Exception as error:
+            return '500 Internal Server Error', json.dumps({'error': f'{type(error).__name__}: {error}'}).encode()
+
+
+def main():
+    parser = ArgumentParser(description='Serve genome and motif queries over local HTTP')
+    parser.add_argument('--genome', action='append', default=[], metavar='NAME=PATH',
+                        help='Genome file to load, may be given multiple times')
+    parser.add_argument('--motifs', action='append', default=[], metavar='NAME=PATH',
+                        help='File of space or newline separated DNA strands, may be given multiple times')
+    parser.add_argument('--skip-header-rows', type=int, default=0)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--unix-socket')
+    parser.add_argument('--processes', type=int)
+    args = parser.parse_args()
+
+    genomes = {}
+    for spec in args.genome:
+        name, path = spec.split('=', 1)
+        genomes[name] = Genome()
+        genomes[name].read_genome(path, skip_header_rows=args.skip_header_rows)
+    motifs = {}
+    for spec in args.motifs:
+        name, path = spec.split('=', 1)
+        with open(path, 'r') as infile:
+            motifs[name] = Motifs(infile.read().split())
+
+    server = GenomeServer(genomes, motifs, args.host, args.port, args.unix_socket, args.processes)
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == '__main__':
+    main()
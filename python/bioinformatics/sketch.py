@@ -0,0 +1,309 @@
+from math import ceil, e, log, log2, sqrt
+from typing import Dict, Iterable, List, Tuple
+
+_MASK_64 = (1 << 64) - 1
+
+
+def hash_64(value: int, seed=0) -> int:
+    """ Mix an integer (e.g. a kmer code) into a well distributed 64 bit hash (splitmix64 finalizer)
+
+    Parameters
+    ----------
+    value : int
+        Integer to hash
+    seed : int, optional default 0
+        Different seeds give independent hash functions
+
+    Returns
+    -------
+    int
+        64 bit hash of *value*
+    """
+    z = (value + (seed + 1) * 0x9E3779B97F4A7C15) & _MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK_64
+    return z ^ (z >> 31)
+
+
+class CountMinSketch:
+    """ Approximate counts of items (kmer codes) in fixed memory, counts are never underestimated
+
+    Parameters
+    ----------
+    width : int, optional default 2048
+        Number of counters per row, estimates exceed the true count by at most e / width * total (w.h.p.)
+    depth : int, optional default 5
+        Number of rows (hash functions), the bound holds with probability 1 - exp(-depth)
+    seed : int, optional default 0
+        Seed of the hash functions, sketches must share a seed to be merged
+    track : int, optional default 0
+        Number of heavy hitter candidates to keep track of, 0 disables tracking
+
+    Attributes
+    ----------
+    table : list
+        *depth* rows of *width* counters
+    total : int
+        Sum of all counts added to the sketch
+    """
+
+    def __init__(self, width=2048, depth=5, seed=0, track=0):
+        if width < 1 or depth < 1:
+            raise ValueError("Count-Min sketch requires a positive width and depth")
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.track = track
+        self.table = [[0] * width for _ in range(depth)]
+        self.total = 0
+        self._candidates: Dict[int, int] = {}
+
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float, seed=0, track=0) -> 'CountMinSketch':
+        """ Size a sketch so estimates are within *epsilon* * total of the true count with probability 1 - *delta*
+
+        Parameters
+        ----------
+        epsilon : float
+            Allowable error as a fraction of the total count
+        delta : float
+            Probability of exceeding the error bound
+        seed : int, optional default 0
+            Seed of the hash functions
+        track : int, optional default 0
+            Number of heavy hitter candidates to keep track of
+
+        Returns
+        -------
+        CountMinSketch
+            Empty sketch with the required width and depth
+        """
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon and delta must be between 0 and 1")
+        return cls(int(ceil(e / epsilon)), int(ceil(log(1 / delta))), seed, track)
+
+    def _columns(self, item: int) -> List[int]:
+        return [hash_64(item, self.seed + row) % self.width for row in range(self.depth)]
+
+    def update(self, item: int, count=1):
+        """ Add *count* occurrences of *item*
+
+        Parameters
+        ----------
+        item : int
+            Item to count, e.g. a kmer code
+        count : int, optional default 1
+            Number of occurrences to add
+        """
+        estimate = None
+        for row, column in zip(self.table, self._columns(item)):
+            row[column] += count
+            if estimate is None or row[column] < estimate:
+                estimate = row[column]
+        self.total += count
+
+        if self.track:
+            self._candidates[item] = estimate
+            if len(self._candidates) > 2 * self.track:
+                self._prune_candidates()
+
+    def update_many(self, items: Iterable[int]):
+        """ Add one occurrence of every item, e.g. the output of *DNA.kmer_codes*
+
+        Parameters
+        ----------
+        items : iterable
+            Items to count
+        """
+        for item in items:
+            self.update(item)
+
+    def estimate(self, item: int) -> int:
+        """ Estimated number of occurrences of *item*
+
+        Parameters
+        ----------
+        item : int
+            Item to look up
+
+        Returns
+        -------
+        int
+            Upper bound of the true count
+        """
+        return min(row[column] for row, column in zip(self.table, self._columns(item)))
+
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        """ Add the counts of another sketch (e.g. from another chunk or worker) into this one
+
+        Parameters
+        ----------
+        other : CountMinSketch
+            Sketch with the same width, depth and seed
+
+        Returns
+        -------
+        CountMinSketch
+            This sketch, now representing both inputs
+        """
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("Count-Min sketches must have the same width, depth and seed to be merged")
+        for row, other_row in zip(self.table, other.table):
+            for column, value in enumerate(other_row):
+                row[column] += value
+        self.total += other.total
+
+        if self.track:
+            items = set(self._candidates) | set(other._candidates)
+            self._candidates = {item: self.estimate(item) for item in items}
+            self._prune_candidates()
+        return self
+
+    def _prune_candidates(self):
+        best = sorted(self._candidates.items(), key=lambda x: x[1], reverse=True)[:self.track]
+        self._candidates = dict(best)
+
+    def most_common(self, n: int = None) -> List[Tuple[int, int]]:
+        """ Tracked items with the highest estimated counts
+
+        Parameters
+        ----------
+        n : int, optional
+            Number of items to return, defaults to all tracked items
+
+        Returns
+        -------
+        list
+            (item, estimated count) sorted from most to least common
+        """
+        if not self.track:
+            raise ValueError("Heavy hitters are only available when the sketch was created with track > 0")
+        counts = sorted(((item, self.estimate(item)) for item in self._candidates), key=lambda x: x[1], reverse=True)
+        return counts[:n] if n is not None else counts
+
+    def heavy_hitters(self, phi: float) -> List[int]:
+        """ Tracked items estimated to make up at least a fraction *phi* of the total count
+
+        Parameters
+        ----------
+        phi : float
+            Minimum fraction of the total count
+
+        Returns
+        -------
+        list
+            Items sorted from most to least common
+        """
+        return [item for item, count in self.most_common() if count >= phi * self.total]
+
+
+class HyperLogLog:
+    """ Estimate the number of distinct items (e.g. distinct kmers) in fixed memory
+
+    Parameters
+    ----------
+    precision : int, optional default 14
+        Uses 2 ** *precision* registers, relative standard error is 1.04 / sqrt(2 ** *precision*)
+    seed : int, optional default 0
+        Seed of the hash function, estimators must share a seed to be merged
+
+    Attributes
+    ----------
+    registers : bytearray
+        Maximum observed rank for each register
+    """
+
+    def __init__(self, precision=14, seed=0):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.seed = seed
+        self.registers = bytearray(1 << precision)
+
+    @classmethod
+    def from_error(cls, relative_error: float, seed=0) -> 'HyperLogLog':
+        """ Create an estimator with at most *relative_error* standard error
+
+        Parameters
+        ----------
+        relative_error : float
+            Allowable relative standard error of the estimate, e.g. 0.01
+        seed : int, optional default 0
+            Seed of the hash function
+
+        Returns
+        -------
+        HyperLogLog
+            Empty estimator
+        """
+        precision = int(ceil(log2((1.04 / relative_error) ** 2)))
+        return cls(min(max(precision, 4), 18), seed)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / sqrt(len(self.registers))
+
+    def update(self, item: int):
+        """ Add an item
+
+        Parameters
+        ----------
+        item : int
+            Item to add, e.g. a kmer code
+        """
+        hashed = hash_64(item, self.seed)
+        index = hashed >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        remaining = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update_many(self, items: Iterable[int]):
+        """ Add every item, e.g. the output of *DNA.kmer_codes*
+
+        Parameters
+        ----------
+        items : iterable
+            Items to add
+        """
+        for item in items:
+            self.update(item)
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """ Combine with another estimator (e.g. from another chunk or worker)
+
+        Parameters
+        ----------
+        other : HyperLogLog
+            Estimator with the same precision and seed
+
+        Returns
+        -------
+        HyperLogLog
+            This estimator, now representing the union of both inputs
+        """
+        if (self.precision, self.seed) != (other.precision, other.seed):
+            raise ValueError("HyperLogLog estimators must have the same precision and seed to be merged")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+    def estimate(self) -> int:
+        """ Estimated number of distinct items added
+
+        Returns
+        -------
+        int
+            Cardinality estimate
+        """
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * log(m / zeros)))  # linear counting is more accurate for small cardinalities
+        return int(round(raw))
+
+    def __len__(self):
+        return self.estimate()
@@ -0,0 +1,109 @@
+from typing import Iterator, Union
+
+from .dna import DNA
+
+
+class StrandView:
+    """ Lazy view of a window of a sequence on either strand, nothing is copied until a part of it is read
+    Position 0 of a reverse strand view is the complement of the last nucleotide of the window
+
+    Parameters
+    ----------
+    sequence : str
+        Forward strand sequence
+    start : int, optional default 0
+        Index of first nucleotide of the window on the forward strand
+    end : int, optional
+        Index after the last nucleotide of the window on the forward strand, defaults to the end of *sequence*
+    reverse_complement : bool, optional default False
+        Whether the view reads the reverse complement of the window
+    """
+
+    def __init__(self, sequence: str, start=0, end: int = None, reverse_complement=False):
+        self.sequence = sequence
+        self.start, self.end, _ = slice(start, end).indices(len(sequence))
+        self.end = max(self.end, self.start)
+        self.is_reverse_complement = reverse_complement
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f'StrandView({self.start}, {self.end}, strand={"-" if self.is_reverse_complement else "+"})'
+
+    def _forward_range(self, start: int, end: int):
+        """ Forward strand coordinates of view positions [start, end) """
+        if self.is_reverse_complement:
+            return self.end - end, self.end - start
+        return self.start + start, self.start + end
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[str, 'StrandView']:
+        if isinstance(item, slice):
+            start, end, step = item.indices(len(self))
+            if step != 1:
+                return str(self)[item]
+            forward_start, forward_end = self._forward_range(start, max(start, end))
+            return StrandView(self.sequence, forward_start, forward_end, self.is_reverse_complement)
+
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError('StrandView index out of range')
+        if self.is_reverse_complement:
+            return DNA.get_reverse_complement(self.sequence[self.end - 1 - item])
+        return self.sequence[self.start + item]
+
+    def __str__(self):
+        window = self.sequence[self.start: self.end]
+        if self.is_reverse_complement:
+            return DNA.get_reverse_complement(window)
+        return window
+
+    def __eq__(self, other):
+        if isinstance(other, (StrandView, str)):
+            return len(self) == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __iter__(self) -> Iterator[str]:
+        for piece in self.chunks():
+            yield from piece
+
+    def chunks(self, chunk_size=65536) -> Iterator[str]:
+        """ Read the view in pieces so only *chunk_size* nucleotides are materialized at a time
+
+        Parameters
+        ----------
+        chunk_size : int, optional default 65536
+            Number of nucleotides per piece
+
+        Returns
+        -------
+        iterator
+            Consecutive pieces of the view in reading order
+        """
+        for start in range(0, len(self), chunk_size):
+            yield str(self[start: start + chunk_size])
+
+    def reverse_complement(self) -> 'StrandView':
+        """ View of the same window on the other strand, without copying """
+        return StrandView(self.sequence, self.start, self.end, not self.is_reverse_complement)
+
+    def kmers(self, k: int, chunk_size=65536) -> Iterator[str]:
+        """ Every kmer of the view in reading order, materializing *chunk_size* + k - 1 nucleotides at a time
+
+        Parameters
+        ----------
+        k : int
+            Length of kmers
+        chunk_size : int, optional default 65536
+            Number of kmers read per piece
+
+        Returns
+        -------
+        iterator
+            kmers of the view
+        """
+        for start in range(0, len(self) - k + 1, chunk_size):
+            piece = str(self[start: start + chunk_size + k - 1])
+            for i in range(len(piece) - k + 1):
+                yield piece[i: i + k]
@@ -0,0 +1,7 @@
+import random
+
+
+def random_sequence(length, seed, alphabet='ACGT'):
+    """ Reproducible random sequence shared by the tests, imported with *from conftest import random_sequence* """
+    rng = random.Random(seed)
+    return ''.join(rng.choice(alphabet) for _ in range(length))
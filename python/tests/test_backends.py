@@ -0,0 +1,118 @@
+import random
+from collections import Counter
+
+import pytest
+
+from python.bioinformatics import backends
+from python.bioinformatics.genome import Genome
+from python.bioinformatics.motifs import Motifs
+
+from conftest import random_sequence
+
+
+SEQUENCES = ['', 'A', 'ACG', 'ACGTACGT', 'AAAAAAAAAA', 'ACGNNACGTA', random_sequence(300, 1),
+             random_sequence(2000, 2)]
+
+
+@pytest.mark.parametrize('sequence', SEQUENCES)
+@pytest.mark.parametrize('k', [1, 3, 5, 12])
+@pytest.mark.parametrize('count_reverse_complement', [False, True])
+@pytest.mark.parametrize('max_distance', [0, 1, 2])
+def test_get_kmer_counts(sequence, k, count_reverse_complement, max_distance):
+    if max_distance == 2 and (k > 5 or len(sequence) > 300):
+        pytest.skip('slow reference')
+    results = backends.compare_backends('get_kmer_counts', sequence, k, count_reverse_complement, max_distance)
+    assert all(results.values()), results
+
+
+@pytest.mark.parametrize('sequence', SEQUENCES)
+@pytest.mark.parametrize('k, L, t', [(3, 20, 2), (5, 50, 3), (4, 1000, 4), (2, 5, 1), (12, 13, 2)])
+def test_find_clumps(sequence, k, L, t):
+    results = backends.compare_backends('find_clumps', sequence, k, L, t)
+    assert all(results.values()), results
+
+
+@pytest.mark.parametrize('sequence', SEQUENCES)
+@pytest.mark.parametrize('k', [1, 4, 9])
+def test_build_kmer_probabilities(sequence, k):
+    rng = random.Random(k)
+    profile = {nuc: [rng.random() for _ in range(k)] for nuc in 'ACGTN'}
+    results = backends.compare_backends('build_kmer_probabilities', sequence, profile, k)
+    assert all(results.values()), results
+
+
+@pytest.mark.parametrize('p, q', [('', ''), ('A', 'C'), ('ACGT', 'ACGA'), (['ACG', 'TTT'], 'ACT')])
+def test_hamming_distance(p, q):
+    results = backends.compare_backends('hamming_distance', p, q)
+    assert all(results.values()), results
+
+
+@pytest.mark.parametrize('pattern, max_distance', [('A', 1), ('ACG', 0), ('ACGT', 1), ('ACGTA', 2)])
+def test_get_neighborhood(pattern, max_distance):
+    results = backends.compare_backends('get_neighborhood', pattern, 'ACGT', max_distance)
+    assert all(results.values()), results
+
+
+@pytest.mark.parametrize('name', backends.available_backends())
+def test_genome_methods_dispatch(name):
+    sequence = random_sequence(3000, 3)
+    expected_counts = Genome._reference_get_kmer_counts(sequence, 4, True, 1)
+    expected_clumps = sorted(Genome(sequence)._reference_find_clumps(4, 100, 4))
+    backends.set_backend(name)
+    try:
+        assert Genome.get_kmer_counts(sequence, 4, True, 1) == expected_counts
+        assert sorted(Genome(sequence).find_clumps(4, 100, 4)) == expected_clumps
+        assert Genome.get_kmer_counts('ACG', 5) == Counter()
+    finally:
+        backends.set_backend(None)
+
+
+def test_build_kmer_probabilities_dispatch():
+    profile = {nuc: [0.1, 0.2, 0.3, 0.4] for nuc in 'ACGT'}
+    sequence = random_sequence(500, 4)
+    assert Motifs._build_kmer_probabilities(sequence, profile, 4) == \
+        Motifs._reference_build_kmer_probabilities(sequence, profile, 4)
+
+
+numpy_only = pytest.mark.skipif('numpy' not in backends.available_backends(), reason='numpy is not installed')
+
+
+@numpy_only
+@pytest.mark.parametrize('dense_limit', [0, 1 << 22])
+@pytest.mark.parametrize('ball_batch', [1, 50, 1 << 20])
+@pytest.mark.parametrize('k, max_distance', [(3, 1), (4, 2), (7, 1)])
+def test_neighbor_counts_in_batches(monkeypatch, dense_limit, ball_batch, k, max_distance):
+    backend = backends.get_backend_by_name('numpy')
+    monkeypatch.setattr(backend, 'dense_limit', dense_limit)
+    monkeypatch.setattr(backend, 'ball_batch', ball_batch)
+    sequence = random_sequence(400, 5)
+    for count_reverse_complement in (False, True):
+        assert backend.get_kmer_counts(sequence, k, count_reverse_complement, max_distance) == \
+            Genome._reference_get_kmer_counts(sequence, k, count_reverse_complement, max_distance)
+
+
+@numpy_only
+def test_neighbor_counts_memory_is_bounded():
+    import tracemalloc
+    backend = backends.get_backend_by_name('numpy')
+    sequence = random_sequence(20000, 6)
+    tracemalloc.start()
+    try:
+        counts = backend.get_kmer_counts(sequence, 8, True, 2)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # building every (kmer, neighbor) pair at once peaked near 600 MB
+    assert peak < 150 * 2 ** 20
+    assert sum(counts.values()) == 2 * (len(sequence) - 7) * (1 + 8 * 3 + 28 * 9)
+
+
+@numpy_only
+@pytest.mark.parametrize('sequence', SEQUENCES + ['ACGTé', 'acgt'])
+@pytest.mark.parametrize('k', [1, 4, 31])
+def test_encode_sequence_and_kmer_codes(sequence, k):
+    nums = backends.encode_sequence(sequence)
+    assert nums.tolist() == ['ACGT'.index(c) if c in 'ACGT' else 4 for c in sequence]
+    expected = [code if set(sequence[i: i + k]) <= set('ACGT') else None
+                for i, code in enumerate(backends.kmer_codes(nums, k).tolist())]
+    assert [code for code in expected if code is not None] == list(Genome.kmer_codes(sequence, k))
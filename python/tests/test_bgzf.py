@@ -0,0 +1,99 @@
+import gzip
+import os
+import struct
+import zlib
+
+import pytest
+
+from python.bioinformatics.bgzf import BgzfGenomeReader, is_bgzf, open_text_file
+from python.bioinformatics.genome import Genome
+
+from conftest import random_sequence
+
+
+def bgzf_block(data: bytes) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    header = struct.pack('<4BI2BH2BHH', 0x1f, 0x8b, 8, 4, 0, 0, 255, 6, 66, 67, 2, 18 + len(compressed) + 7)
+    return header + compressed + struct.pack('<2I', zlib.crc32(data), len(data))
+
+
+def write_bgzf(file_path: str, text: str, block_size: int):
+    data = text.encode()
+    with open(file_path, 'wb') as outfile:
+        for start in range(0, len(data), block_size):
+            outfile.write(bgzf_block(data[start: start + block_size]))
+        outfile.write(bgzf_block(b''))  # end of file marker
+
+
+@pytest.fixture
+def genome_file(tmp_path):
+    sequence = random_sequence(2000, 1)
+    text = 'header line\n' + '\n'.join(sequence[i: i + 60] for i in range(0, len(sequence), 60)) + '\n'
+    file_path = str(tmp_path / 'genome.txt.bgz')
+    write_bgzf(file_path, text, 97)  # blocks split lines and the header
+    return file_path, sequence
+
+
+def test_plain_readers_understand_bgzf(genome_file, tmp_path):
+    file_path, sequence = genome_file
+    assert is_bgzf(file_path)
+    assert Genome().read_genome(file_path, skip_header_rows=1) == sequence
+    with open_text_file(file_path) as infile:
+        assert infile.readline() == 'header line\n'
+    plain = str(tmp_path / 'plain.txt.gz')
+    with gzip.open(plain, 'wt') as outfile:
+        outfile.write(sequence)
+    assert not is_bgzf(plain)
+    assert Genome().read_genome(plain) == sequence
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_fetch_matches_slicing(genome_file, workers):
+    file_path, sequence = genome_file
+    reader = BgzfGenomeReader(file_path, skip_header_rows=1, workers=workers).build_index()
+    assert reader.length == len(sequence)
+    assert reader.read() == sequence
+    for start, end in [(0, 1), (0, 97), (55, 300), (1999, 2000), (1000, 5000), (-10, None), (500, 400), (0, 2000)]:
+        assert reader.fetch(start, end if end is not None else reader.length) == sequence[start: end]
+
+
+def test_index_round_trip(genome_file, tmp_path):
+    file_path, sequence = genome_file
+    index_path = str(tmp_path / 'genome.index')
+    built = BgzfGenomeReader(file_path, skip_header_rows=1).build_index()
+    built.save_index(index_path)
+    loaded = BgzfGenomeReader(file_path, skip_header_rows=1).load_index(index_path)
+    assert (loaded.length, list(loaded._index)) == (built.length, list(built._index))
+    assert loaded.fetch(123, 1456) == sequence[123: 1456]
+
+    with pytest.raises(ValueError):
+        BgzfGenomeReader(file_path, skip_header_rows=0).load_index(index_path)
+
+
+def test_stale_index_is_rejected(genome_file, tmp_path):
+    file_path, sequence = genome_file
+    index_path = str(tmp_path / 'genome.index')
+    BgzfGenomeReader(file_path, skip_header_rows=1).build_index().save_index(index_path)
+
+    # same length, different sequence, blocks of a different size
+    write_bgzf(file_path, 'header line\n' + sequence[::-1], 50)
+    status = os.stat(file_path)
+    os.utime(file_path, ns=(status.st_atime_ns, status.st_mtime_ns + 10 ** 9))
+    with pytest.raises(ValueError, match='stale'):
+        BgzfGenomeReader(file_path, skip_header_rows=1).load_index(index_path)
+    assert BgzfGenomeReader(file_path, skip_header_rows=1).read() == sequence[::-1]
+
+    with open(index_path, 'wb') as outfile:
+        outfile.write(b'\x00' * 12)
+    with pytest.raises(ValueError):
+        BgzfGenomeReader(file_path, skip_header_rows=1).load_index(index_path)
+
+
+def test_not_bgzf(tmp_path):
+    file_path = str(tmp_path / 'genome.txt')
+    with open(file_path, 'w') as outfile:
+        outfile.write('ACGT')
+    assert not is_bgzf(file_path)
+    with pytest.raises(ValueError):
+        BgzfGenomeReader(file_path).build_index()
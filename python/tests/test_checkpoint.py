@@ -0,0 +1,70 @@
+import random
+
+import numpy
+import pytest
+
+from python.bioinformatics.checkpoint import Checkpoint
+from python.bioinformatics.genome import Genome
+from python.bioinformatics.motifs import Motifs
+
+
+class InterruptingCheckpoint(Checkpoint):
+    """ Simulates the process being killed right after the *stop_after* th save """
+
+    def __init__(self, file_path, stop_after):
+        super().__init__(file_path, interval=0)
+        self.stop_after = stop_after
+
+    def save(self, state):
+        super().save(state)
+        if self.saves == self.stop_after:
+            raise KeyboardInterrupt
+
+
+def random_strands(seed, count=5, length=40):
+    rng = random.Random(seed)
+    return [''.join(rng.choice('ACGT') for _ in range(length)) for _ in range(count)]
+
+
+def test_gibbs_sampler_resume_matches_uninterrupted_run(tmp_path):
+    motifs = Motifs(random_strands(1))
+    random.seed(3)
+    numpy.random.seed(3)
+    expected = motifs.gibbs_sampler(5, restarts=3, iterations=30)
+
+    random.seed(3)
+    numpy.random.seed(3)
+    with pytest.raises(KeyboardInterrupt):
+        motifs.gibbs_sampler(5, restarts=3, iterations=30, checkpoint=InterruptingCheckpoint(tmp_path / 'g', 40))
+    assert Motifs.resume_gibbs_sampler(Checkpoint(tmp_path / 'g', interval=0)) == expected
+    assert not (tmp_path / 'g').exists()
+
+
+def test_checkpointed_kmer_counts_resume(tmp_path):
+    genome = Genome(random_strands(2, count=1, length=3000)[0])
+    with pytest.raises(KeyboardInterrupt):
+        genome.checkpointed_kmer_counts(4, InterruptingCheckpoint(tmp_path / 'k', 2), True, 1, chunk_size=500)
+    assert genome.checkpointed_kmer_counts(4, Checkpoint(tmp_path / 'k', interval=0), True, 1, chunk_size=500) == \
+        Genome.get_kmer_counts(genome.sequence, 4, True, 1)
+
+
+def test_checkpointed_kmer_counts_refuses_another_genome_of_the_same_length(tmp_path):
+    first, second = random_strands(3, count=2, length=3000)
+    with pytest.raises(KeyboardInterrupt):
+        Genome(first).checkpointed_kmer_counts(4, InterruptingCheckpoint(tmp_path / 'k', 2), chunk_size=500)
+    with pytest.raises(ValueError):
+        Genome(second).checkpointed_kmer_counts(4, Checkpoint(tmp_path / 'k', interval=0), chunk_size=500)
+    assert Genome(first).checkpointed_kmer_counts(4, Checkpoint(tmp_path / 'k', interval=0), chunk_size=500) == \
+        Genome.get_kmer_counts(first, 4)
+
+
+def test_load_rejects_other_runs(tmp_path):
+    checkpoint = Checkpoint(tmp_path / 'c')
+    assert checkpoint.load('gibbs_sampler') is None
+    checkpoint.save({'kind': 'kmer_counts', 'parameters': {'k': 3}})
+    with pytest.raises(ValueError):
+        checkpoint.load('gibbs_sampler')
+    with pytest.raises(ValueError):
+        checkpoint.load('kmer_counts', {'k': 4})
+    assert checkpoint.load('kmer_counts', {'k': 3})['parameters'] == {'k': 3}
+    assert [path.name for path in tmp_path.iterdir()] == ['c']
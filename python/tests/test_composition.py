@@ -0,0 +1,59 @@
+import pytest
+
+from python.bioinformatics.composition import CompositionIndex
+from python.bioinformatics.genome import Genome
+
+from conftest import random_sequence
+
+
+def intervals(length):
+    points = sorted({0, 1, 2, length // 3, length // 2, length - 1, length} & set(range(length + 1)))
+    return [(start, end) for start in points for end in points if start <= end]
+
+
+@pytest.mark.parametrize('sequence', ['', 'G', 'ACGTN', random_sequence(1000, 1), random_sequence(777, 2, 'ACGTN')])
+@pytest.mark.parametrize('sample_rate', [1, 7, 64, 5000])
+def test_queries_match_direct_counting(sequence, sample_rate):
+    index = CompositionIndex(Genome(sequence), sample_rate)
+    for start, end in intervals(len(sequence)):
+        window = sequence[start: end]
+        assert index.counts(start, end) == {nuc: window.count(nuc) for nuc in 'ACGT'}
+        assert index.skew(start, end) == window.count('G') - window.count('C')
+        expected_gc = (window.count('G') + window.count('C')) / len(window) if window else 0.0
+        assert index.gc_content(start, end) == pytest.approx(expected_gc)
+    assert index.counts_many(intervals(len(sequence))) == [index.counts(*i) for i in intervals(len(sequence))]
+
+
+def test_skew_agrees_with_minimum_skew():
+    genome = Genome(random_sequence(2000, 3))
+    index = CompositionIndex(genome, 16)
+    skews = [index.skew(0, i) for i in range(len(genome.sequence) + 1)]
+    assert [i for i, value in enumerate(skews) if value == min(skews)] == genome.minimum_skew()
+
+
+@pytest.mark.parametrize('metric', ['gc', 'skew', 'A'])
+def test_tracks(metric):
+    sequence = random_sequence(1000, 4)
+    index = CompositionIndex(Genome(sequence), 10)
+    bins = [sequence[start: start + 64] for start in range(0, len(sequence), 64)]
+    direct = {
+        'gc': [(b.count('G') + b.count('C')) / len(b) for b in bins],
+        'skew': [b.count('G') - b.count('C') for b in bins],
+        'A': [b.count('A') for b in bins],
+    }
+    assert index.track(64, metric) == pytest.approx(direct[metric])
+    tracks = index.multi_resolution_track(64, metric)
+    assert list(tracks) == [64, 128, 256, 512, 1024]
+    assert len(tracks[1024]) == 1
+
+
+def test_invalid_queries():
+    index = CompositionIndex(Genome('ACGT'))
+    with pytest.raises(IndexError):
+        index.counts(2, 1)
+    with pytest.raises(IndexError):
+        index.skew(0, 5)
+    with pytest.raises(ValueError):
+        index.track(2, 'N')
+    with pytest.raises(ValueError):
+        CompositionIndex(Genome('ACGT'), 0)
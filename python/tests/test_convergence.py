@@ -0,0 +1,44 @@
+import random
+
+from python.bioinformatics.convergence import ConvergenceMonitor
+from python.bioinformatics.motifs import Motifs
+
+
+def test_confidence_needs_a_sample():
+    monitor = ConvergenceMonitor(confidence=0.9)
+    monitor.start()
+    stops = [monitor.restart(8) for _ in range(9)]
+    assert not any(stops)  # ties early on are not evidence of convergence
+    assert monitor.restart(8)
+    assert monitor.stopped == 'confidence'
+
+
+def test_confidence_waits_for_best_score_to_repeat():
+    monitor = ConvergenceMonitor(confidence=0.5)
+    monitor.start()
+    assert [monitor.restart(score) for score in [5, 6, 6]] == [False, False, False]
+    assert monitor.restart(5)
+
+
+def test_patience():
+    monitor = ConvergenceMonitor(patience=3)
+    monitor.start()
+    assert [monitor.restart(score) for score in [5, 4, 4, 6, 4]] == [False, False, False, False, True]
+    assert monitor.stopped == 'patience'
+
+
+def test_time_budget_counts_last_restart():
+    motifs = Motifs([''.join(random.Random(i).choice('ACGT') for _ in range(200)) for i in range(10)])
+    random.seed(0)
+    motifs.randomized_motif_search(8, 100000, time_budget=0.2)
+    report = motifs.search_report
+    assert report['stopped'] == 'time_budget'
+    assert report['restarts'] == report['iterations']
+    assert report['seconds'] >= 0.2
+
+
+def test_confidence_does_not_stop_after_two_ties():
+    motifs = Motifs([''.join(random.Random(i).choice('ACGT') for _ in range(100)) for i in range(8)])
+    random.seed(1)
+    motifs.randomized_motif_search(5, 1000, confidence=0.9)
+    assert motifs.search_report['restarts'] >= 10
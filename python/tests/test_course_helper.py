@@ -0,0 +1,83 @@
+import gzip
+import os
+import stat
+
+import numpy
+import pytest
+
+from python.bioinformatics.atomic import atomic_open
+from python.bioinformatics.course_helper import parse_genome_file, write_output
+
+
+@pytest.mark.parametrize('output, joiner, expected', [
+    ('ACGT', ' ', 'ACGT'),
+    ([], ' ', ''),
+    ([1, 2, 3], ' ', '1 2 3'),
+    (range(5), '\n', '0\n1\n2\n3\n4'),
+    (numpy.arange(6).reshape(2, 3), ',', '0,1,2,3,4,5'),
+])
+@pytest.mark.parametrize('chunk_size', [1, 2, 65536])
+def test_write_output_text(tmp_path, output, joiner, expected, chunk_size):
+    file_path = str(tmp_path / 'out.txt')
+    write_output(file_path, output, joiner=joiner, chunk_size=chunk_size)
+    with open(file_path) as infile:
+        assert infile.read() == expected
+    write_output(file_path + '.gz', output, joiner=joiner, chunk_size=chunk_size)
+    with gzip.open(file_path + '.gz', 'rt') as infile:
+        assert infile.read() == expected
+
+
+@pytest.mark.parametrize('file_name', ['out.npy', 'out.npy.gz'])
+def test_write_output_npy(tmp_path, file_name):
+    file_path = str(tmp_path / file_name)
+    write_output(file_path, range(10), binary=True)
+    opener = gzip.open if file_name.endswith('.gz') else open
+    with opener(file_path, 'rb') as infile:
+        assert numpy.load(infile).tolist() == list(range(10))
+    array = numpy.array([[1.5, 2.5], [3.5, 4.5]])
+    write_output(file_path, array, binary=True, overwrite=True)
+    with opener(file_path, 'rb') as infile:
+        assert numpy.array_equal(numpy.load(infile), array)
+
+
+def test_write_output_overwrite(tmp_path):
+    file_path = str(tmp_path / 'out.txt')
+    write_output(file_path, 'first')
+    with pytest.raises(IOError):
+        write_output(file_path, 'second')
+    with open(file_path) as infile:
+        assert infile.read() == 'first'
+    write_output(file_path, 'second', overwrite=True)
+    with open(file_path) as infile:
+        assert infile.read() == 'second'
+
+
+def test_failed_write_leaves_nothing_behind(tmp_path):
+    def output():
+        yield 'A'
+        raise RuntimeError('generator failed')
+
+    file_path = str(tmp_path / 'out.txt')
+    write_output(file_path, 'old')
+    with pytest.raises(RuntimeError):
+        write_output(file_path, output(), chunk_size=1, overwrite=True)
+    assert os.listdir(str(tmp_path)) == ['out.txt']
+    with open(file_path) as infile:
+        assert infile.read() == 'old'
+
+
+def test_atomic_open_uses_default_permissions(tmp_path):
+    file_path = str(tmp_path / 'out.bin')
+    with atomic_open(file_path) as outfile:
+        outfile.write(b'\x00\x01')
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(file_path).st_mode) == 0o666 & ~umask
+    with open(file_path, 'rb') as infile:
+        assert infile.read() == b'\x00\x01'
+
+
+def test_parse_genome_file_round_trip(tmp_path):
+    file_path = str(tmp_path / 'genome.txt.gz')
+    write_output(file_path, ['3 1', 'ACGT', 'TTGA', 'end'], joiner='\n')
+    assert parse_genome_file(file_path, has_header=True, has_footer=True) == ('ACGTTTGA', '3 1', 'end')
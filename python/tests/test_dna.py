@@ -0,0 +1,55 @@
+from itertools import product
+
+import pytest
+
+from python.bioinformatics.distance import hamming_distance
+from python.bioinformatics.dna import DNA
+
+from conftest import random_sequence
+
+
+def reverse_complement(pattern):
+    return ''.join({'A': 'T', 'C': 'G', 'G': 'C', 'T': 'A', 'N': 'N'}[nuc] for nuc in reversed(pattern))
+
+
+@pytest.mark.parametrize('pattern', ['', 'A', 'ACTG', 'GGGNNNCA', random_sequence(1000, 1),
+                                     random_sequence(100, 2, 'ACGTN')])
+def test_reverse_complement(pattern):
+    assert DNA.get_reverse_complement(pattern) == reverse_complement(pattern)
+    assert DNA.get_reverse_complement(DNA.get_reverse_complement(pattern)) == pattern
+
+
+@pytest.mark.parametrize('pattern, character', [('acgt', 'a'), ('ACGU', 'U'), ('AC GT', ' '), ('ACG\n', '\n'),
+                                                ('AÇG', 'Ç')])
+def test_reverse_complement_rejects_other_characters(pattern, character):
+    with pytest.raises(KeyError) as error:
+        DNA.get_reverse_complement(pattern)
+    assert error.value.args == (character,)
+
+
+@pytest.mark.parametrize('k', [1, 2, 5])
+def test_pattern_number_round_trip(k):
+    for number, kmer in enumerate(map(''.join, product('ACGT', repeat=k))):
+        assert DNA.pattern_to_number(kmer) == number
+        assert DNA.number_to_pattern(number, k) == kmer
+
+
+@pytest.mark.parametrize('sequence', ['', 'ACG', random_sequence(500, 3), random_sequence(500, 4, 'ACGTN'),
+                                      'ACGTNACGTNNA'])
+@pytest.mark.parametrize('k', [1, 3, 8])
+def test_kmer_codes_brute_force(sequence, k):
+    expected = [(i, DNA.pattern_to_number(sequence[i: i + k])) for i in range(len(sequence) - k + 1)
+                if 'N' not in sequence[i: i + k]]
+    assert list(DNA.indexed_kmer_codes(sequence, k)) == expected
+    assert list(DNA.kmer_codes(sequence, k)) == [code for _, code in expected]
+    canonical = [min(code, DNA.pattern_to_number(reverse_complement(DNA.number_to_pattern(code, k))))
+                 for _, code in expected]
+    assert list(DNA.canonical_kmer_codes(sequence, k)) == canonical
+
+
+@pytest.mark.parametrize('pattern, max_distance', [('A', 0), ('A', 1), ('ACG', 1), ('ACGT', 2)])
+def test_neighbors_brute_force(pattern, max_distance):
+    expected = {''.join(kmer) for kmer in product('ACGT', repeat=len(pattern))
+                if hamming_distance(''.join(kmer), pattern) <= max_distance}
+    neighbors = DNA._get_neighbors(pattern, max_distance)
+    assert sorted(neighbors) == sorted(expected)
@@ -0,0 +1,59 @@
+import gzip
+import random
+
+import pytest
+
+from python.bioinformatics.genome import Genome
+from python.bioinformatics.genome_set import GenomeSet
+
+
+@pytest.fixture
+def genome_files(tmp_path):
+    rng = random.Random(0)
+    sequences = {}
+    for i, name in enumerate(['GCF_1.1', 'GCF_1.2', 'plain']):
+        sequence = ''.join(rng.choice('ACGT') for _ in range(2000))
+        sequences[name] = sequence
+        if i % 2:
+            with gzip.open(tmp_path / f'{name}.fna.gz', 'wt') as outfile:
+                outfile.write('header\n' + sequence + '\n')
+        else:
+            (tmp_path / f'{name}.txt').write_text('header\n' + sequence + '\n')
+    return tmp_path, sequences
+
+
+def test_names_keep_versions(genome_files):
+    directory, sequences = genome_files
+    genome_set = GenomeSet.from_directory(directory, '*', skip_header_rows=1)
+    assert sorted(genome_set.names) == sorted(sequences)
+    assert {name: genome.sequence for name, genome in genome_set} == sequences
+
+
+def test_duplicate_names_raise(tmp_path):
+    with pytest.raises(ValueError):
+        GenomeSet([str(tmp_path / 'a.txt'), str(tmp_path / 'b' / 'a.txt.gz')])
+
+
+def test_unknown_method_raises_eagerly(genome_files):
+    genome_set = GenomeSet.from_directory(genome_files[0], '*')
+    with pytest.raises(ValueError):
+        genome_set.apply('no_such_method')
+    with pytest.raises(ValueError):
+        genome_set.apply('_reference_find_clumps')
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_apply_matches_genome(genome_files, processes):
+    directory, sequences = genome_files
+    genome_set = GenomeSet.from_directory(directory, '*', skip_header_rows=1)
+    rows = list(genome_set.apply('find_clumps', 4, 200, 3, processes=processes, max_in_flight=1))
+    assert sorted(row['genome'] for row in rows) == sorted(sequences)
+    for row in rows:
+        assert row['error'] is None
+        assert sorted(row['result']) == sorted(Genome(sequences[row['genome']]).find_clumps(4, 200, 3))
+
+
+def test_errors_are_reported_per_genome(tmp_path):
+    rows = list(GenomeSet({'missing': str(tmp_path / 'missing.txt')}).apply('minimum_skew', processes=1))
+    assert rows[0]['error'].startswith('FileNotFoundError')
+    assert list(GenomeSet.tidy(rows))[0]['value'] is None
@@ -0,0 +1,68 @@
+from math import log
+
+import pytest
+
+from python.bioinformatics.dna import DNA
+from python.bioinformatics.genome import Genome
+from python.bioinformatics.genome_set import GenomeSet
+from python.bioinformatics.minhash import MinHashSketch, distance_matrix, sketch_genomes
+
+from conftest import random_sequence
+
+
+def mutate(sequence, every):
+    return ''.join('A' if i % every == 0 and nuc != 'A' else nuc for i, nuc in enumerate(sequence))
+
+
+@pytest.mark.parametrize('every', [7, 20, 100])
+def test_jaccard_is_exact_when_the_sketch_holds_every_kmer(every):
+    first = random_sequence(400, 1)
+    second = mutate(first, every)
+    a, b = set(DNA.canonical_kmer_codes(first, 9)), set(DNA.canonical_kmer_codes(second, 9))
+    jaccard = len(a & b) / len(a | b)
+    sketches = [MinHashSketch.from_genome(sequence, k=9, size=1000) for sequence in (first, second)]
+    assert sketches[0].jaccard(sketches[1]) == pytest.approx(jaccard)
+    assert sketches[0].distance(sketches[1]) == pytest.approx(-log(2 * jaccard / (1 + jaccard)) / 9)
+
+
+def test_sketch_keeps_smallest_hashes_and_is_strand_independent():
+    sequence = random_sequence(3000, 2)
+    sketch = MinHashSketch.from_genome(Genome(sequence), k=11, size=50)
+    assert sketch.hashes == MinHashSketch.from_genome(Genome.get_reverse_complement(sequence), k=11, size=50).hashes
+    halves = MinHashSketch(11, 50)
+    halves.add_sequence(sequence[:1500])
+    halves.add_sequence(sequence[1490:])
+    assert halves.hashes == sketch.hashes
+    assert len(sketch.hashes) == 50 and sketch.hashes == sorted(sketch.hashes)
+    assert sketch.jaccard(sketch) == 1.0 and sketch.distance(sketch) == 0.0
+    assert MinHashSketch(11, 50).distance(MinHashSketch(11, 50)) == 1.0
+    with pytest.raises(ValueError):
+        sketch.jaccard(MinHashSketch(k=12, size=50))
+
+
+def test_save_and_load(tmp_path):
+    sketch = MinHashSketch.from_genome(random_sequence(1000, 3), k=7, size=20, seed=4, name='E. coli')
+    file_path = str(tmp_path / 'sketch.json')
+    sketch.save(file_path)
+    loaded = MinHashSketch.load(file_path)
+    assert loaded.to_dict() == sketch.to_dict()
+
+
+def test_sketch_genomes_keeps_names(tmp_path):
+    sequences = {'first': random_sequence(800, 4), 'second': random_sequence(800, 5)}
+    sequences['third'] = mutate(sequences['first'], 50)
+    sketches = sketch_genomes(sequences, k=8, size=200, processes=1)
+    assert [sketch.name for sketch in sketches] == ['first', 'second', 'third']
+    assert [sketch.name for sketch in sketch_genomes(list(sequences.items()), k=8, processes=1)] == list(sequences)
+    assert [sketch.name for sketch in sketch_genomes(list(sequences.values()), k=8, processes=1)] == ['0', '1', '2']
+
+    for name, sequence in sequences.items():
+        (tmp_path / f'{name}.txt').write_text(sequence)
+    from_files = sketch_genomes(GenomeSet.from_directory(str(tmp_path)), k=8, size=200, processes=1)
+    assert [sketch.to_dict() for sketch in from_files] == [sketch.to_dict() for sketch in sketches]
+
+    matrix = distance_matrix(sketches, processes=1)
+    for i, row in enumerate(matrix):
+        for j, distance in enumerate(row):
+            assert distance == sketches[i].distance(sketches[j])
+    assert matrix[0][2] < matrix[0][1]
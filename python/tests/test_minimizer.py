@@ -0,0 +1,55 @@
+import pytest
+
+from python.bioinformatics.genome import Genome
+from python.bioinformatics.minimizer import MinimizerIndex, minimizers
+from python.bioinformatics.sketch import hash_64
+
+from conftest import random_sequence
+
+
+@pytest.mark.parametrize('sequence', ['', 'ACGT', random_sequence(500, 1), 'ACGTACGTNACGTTTTGACNNACGGATCGATCGA'])
+@pytest.mark.parametrize('k, w', [(3, 1), (4, 3), (5, 8)])
+def test_minimizers_brute_force(sequence, k, w):
+    expected = []
+    runs = [(i, sequence[i: i + k]) for i in range(len(sequence) - k + 1)]
+    kmers = [(i, kmer) for i, kmer in runs if set(kmer) <= set('ACGT')]
+    for j in range(len(kmers) - w + 1):
+        window = kmers[j: j + w]
+        if window[-1][0] - window[0][0] != w - 1:
+            continue  # windows never span a non nucleotide
+        position, kmer = min(window, key=lambda x: (hash_64(Genome.pattern_to_number(x[1])), -x[0]))
+        if not expected or expected[-1][0] != position:
+            expected.append((position, Genome.pattern_to_number(kmer)))
+    assert list(minimizers(sequence, k, w)) == expected
+
+
+@pytest.mark.parametrize('max_distance', [0, 1, 2])
+def test_pattern_match_index(max_distance):
+    genome = Genome(random_sequence(5000, 2))
+    index = MinimizerIndex(genome, k=8, w=4)
+    for start in (0, 1234, 4970):
+        pattern = genome.sequence[start: start + 30]
+        found = index.pattern_match_index(pattern, max_distance)
+        assert start in found
+        assert set(found) <= set(genome.pattern_match_index(pattern, max_distance))
+    with pytest.raises(ValueError):
+        index.candidates('ACGT')
+
+
+def test_save_and_load(tmp_path):
+    genome = Genome(random_sequence(3000, 3))
+    index = MinimizerIndex(genome, k=9, w=5)
+    file_path = str(tmp_path / 'genome.mzi')
+    index.save(file_path)
+    loaded = MinimizerIndex.load(file_path, genome)
+    assert (loaded.k, loaded.w) == (9, 5)
+    assert (loaded.codes, loaded.offsets, loaded.positions) == (index.codes, index.offsets, index.positions)
+
+    with pytest.raises(ValueError, match='different length'):
+        MinimizerIndex.load(file_path, Genome(genome.sequence[1:]))
+    with pytest.raises(ValueError, match='different genome'):
+        MinimizerIndex.load(file_path, Genome(genome.sequence[::-1]))
+    with open(file_path, 'wb') as outfile:
+        outfile.write(b'MZI1')
+    with pytest.raises(ValueError, match='not a minimizer index'):
+        MinimizerIndex.load(file_path, genome)
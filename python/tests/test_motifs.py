@@ -0,0 +1,44 @@
+import random
+from collections import Counter
+
+import pytest
+
+from python.bioinformatics.distance import hamming_distance
+from python.bioinformatics.motifs import Motifs, _projections_needed
+
+
+def planted_motif(seed, k, d, t, n):
+    """ *t* random strands of length *n*, each with a copy of a random kmer with exactly *d* mutations """
+    rng = random.Random(seed)
+    motif = ''.join(rng.choice('ACGT') for _ in range(k))
+    strands = []
+    for _ in range(t):
+        strand = [rng.choice('ACGT') for _ in range(n)]
+        copy = list(motif)
+        for position in rng.sample(range(k), d):
+            copy[position] = rng.choice([nuc for nuc in 'ACGT' if nuc != copy[position]])
+        start = rng.randrange(n - k + 1)
+        strand[start: start + k] = copy
+        strands.append(''.join(strand))
+    return motif, strands
+
+
+def consensus(motifs):
+    return ''.join(Counter(column).most_common(1)[0][0] for column in zip(*motifs))
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_projection_motif_search_recovers_planted_motif(seed):
+    motif, strands = planted_motif(seed, k=11, d=2, t=15, n=300)
+    found = Motifs(strands).projection_motif_search(11, 2, processes=1, seed=seed)
+    assert hamming_distance(consensus(found), motif) == 0
+
+
+def test_projections_needed_grows_with_harder_instances():
+    assert _projections_needed(20, 15, 4, 7, 3, 0.95) < _projections_needed(20, 15, 4, 8, 3, 0.95)
+    assert _projections_needed(20, 15, 4, 7, 3, 0.99) > _projections_needed(20, 15, 4, 7, 3, 0.9)
+
+
+def test_projection_motif_search_short_strand():
+    with pytest.raises(ValueError):
+        Motifs(['ACGTACGTAC', 'ACG']).projection_motif_search(5, 1, processes=1)
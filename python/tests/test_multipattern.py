@@ -0,0 +1,39 @@
+import pytest
+
+from python.bioinformatics.dna import DNA
+from python.bioinformatics.genome import Genome
+from python.bioinformatics.multipattern import AhoCorasick, multi_pattern_match_index
+
+from conftest import random_sequence
+
+
+def expected_matches(genome, patterns, max_distance, include_reverse_complement):
+    expected = {}
+    for pattern in patterns:
+        indices = set(genome.pattern_match_index(pattern, max_distance))
+        if include_reverse_complement:
+            indices.update(genome.pattern_match_index(DNA.get_reverse_complement(pattern), max_distance))
+        expected[pattern] = sorted(indices)
+    return expected
+
+
+PATTERNS = [['A'], ['ACG', 'CGT', 'ACG'], ['AT', 'ATG', 'ATGATCAAG', 'TCA', 'GGGG'], ['ACGT', 'AAAA', 'TTTT']]
+
+
+@pytest.mark.parametrize('sequence', ['', 'AC', 'ACGTACGT', 'AAAAAAAA', 'ACNTACGN', random_sequence(2000, 1),
+                                      random_sequence(1000, 2, 'ACGTN')])
+@pytest.mark.parametrize('patterns', PATTERNS)
+@pytest.mark.parametrize('max_distance', [0, 1, 2])
+@pytest.mark.parametrize('include_reverse_complement', [False, True])
+def test_multi_pattern_match_index(sequence, patterns, max_distance, include_reverse_complement):
+    genome = Genome(sequence)
+    assert multi_pattern_match_index(sequence, patterns, max_distance, include_reverse_complement) == \
+        expected_matches(genome, dict.fromkeys(patterns), max_distance, include_reverse_complement)
+    assert genome.multi_pattern_match_index(patterns, max_distance, include_reverse_complement) == \
+        expected_matches(genome, dict.fromkeys(patterns), max_distance, include_reverse_complement)
+
+
+def test_aho_corasick_overlapping_patterns():
+    matcher = AhoCorasick(['he', 'she', 'his', 'hers'])
+    hits = sorted((index, matcher.patterns[pattern_id]) for index, pattern_id in matcher.search('ushers'))
+    assert hits == [(1, 'she'), (2, 'he'), (2, 'hers')]
@@ -0,0 +1,53 @@
+import pytest
+
+from python.bioinformatics.genome import Genome
+from python.bioinformatics.origin import _circular_slice, reverse_complement_clumps, skew_minima_windows
+
+from conftest import random_sequence
+
+
+@pytest.mark.parametrize('start, end', [(-3, 2), (8, 13), (2, 5), (-3, 0), (0, 10), (-12, -2)])
+def test_circular_slice(start, end):
+    sequence = 'ABCDEFGHIJ'
+    assert _circular_slice(sequence, start, end) == ''.join(sequence[i % 10] for i in range(start, end))
+
+
+def test_windows_wrap_and_merge_across_the_ends():
+    assert skew_minima_windows([1, 2, 98], 100, 10) == [(-7, 7, [-2, 1, 2])]
+    assert skew_minima_windows([1, 2, 98], 100, 10, circular=False) == [(0, 7, [1, 2]), (93, 100, [98])]
+
+
+def test_window_never_exceeds_genome():
+    assert skew_minima_windows([40], 80, 100) == [(0, 80, [40])]
+    genome = Genome(random_sequence(80, 1))
+    windows = genome.find_origin(k=4, max_distance=0, window=100)
+    expected = Genome.get_kmer_counts(genome.sequence, 4, True)
+    assert [window['max_count'] for window in windows] == [max(expected.values())]
+
+
+def test_empty_genome():
+    assert Genome('').find_origin() == []
+
+
+def test_find_origin_matches_whole_window_counts():
+    genome = Genome(random_sequence(5000, 2))
+    windows = genome.find_origin(k=5, max_distance=1, window=300, processes=1)
+    for window in windows:
+        sequence = _circular_slice(genome.sequence, window['start'], window['end'])
+        frequency = Genome.get_kmer_counts(sequence, 5, True, 1)
+        assert window['max_count'] == max(frequency.values())
+        assert window['frequent_kmers'] == sorted(k for k, c in frequency.items() if c == window['max_count'])
+    assert windows == genome.find_origin(k=5, max_distance=1, window=300, processes=2)
+
+
+def test_reverse_complement_clumps_brute_force():
+    sequence, k, L, t = random_sequence(1500, 3), 3, 60, 4
+    expected = set()
+    for start in range(len(sequence) - L + 1):
+        window = sequence[start: start + L]
+        kmers = [window[i: i + k] for i in range(L - k + 1)]
+        for kmer in set(kmers):
+            if kmers.count(kmer) + kmers.count(Genome.get_reverse_complement(kmer)) * (kmer != Genome.get_reverse_complement(kmer)) >= t:
+                expected.update({kmer, Genome.get_reverse_complement(kmer)})
+    found = set(reverse_complement_clumps(sequence, k, L, t))
+    assert found == expected & set(sequence[i: i + k] for i in range(len(sequence) - k + 1))
@@ -0,0 +1,29 @@
+import pytest
+
+from python.bioinformatics.genome import Genome
+from python.bioinformatics.parallel import ParallelGenome
+
+from conftest import random_sequence
+
+
+@pytest.fixture(scope='module', params=['', 'G', 'CCCC', random_sequence(5000, 1), random_sequence(3000, 2, 'ACGTN')])
+def genome(request):
+    return Genome(request.param)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1000, 1000000])
+def test_parallel_scans_match_genome(genome, chunk_size):
+    with ParallelGenome(genome, processes=2, chunk_size=chunk_size) as parallel:
+        assert parallel.minimum_skew() == genome.minimum_skew()
+        for pattern, max_distance in [('ACG', 0), ('ATGATCAAG', 2), ('A' * 20, 1)]:
+            assert parallel.pattern_match_index(pattern, max_distance) == \
+                genome.pattern_match_index(pattern, max_distance)
+            assert parallel.pattern_count(pattern, max_distance) == genome.pattern_count(pattern, max_distance)
+        for k, count_reverse_complement, max_distance in [(1, False, 0), (4, True, 1), (9, False, 0)]:
+            assert parallel.get_kmer_counts(k, count_reverse_complement, max_distance) == \
+                Genome.get_kmer_counts(genome.sequence, k, count_reverse_complement, max_distance)
+
+
+def test_chunk_size_must_be_positive():
+    with pytest.raises(ValueError):
+        ParallelGenome(Genome('ACGT'), chunk_size=0)
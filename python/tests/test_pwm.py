@@ -0,0 +1,60 @@
+import pytest
+
+from python.bioinformatics.genome import Genome
+from python.bioinformatics.pwm import PositionWeightMatrix
+
+from conftest import random_sequence
+
+MOTIFS = ['ACGTTGCA', 'ACGTTGCT', 'ACCTTGCA', 'TCGTTGCA', 'ACGATGCA']
+
+
+def brute_force_hits(pwm, sequence, both_strands=True):
+    hits = []
+    for i in range(len(sequence) - pwm.k + 1):
+        window = sequence[i: i + pwm.k]
+        if set(window) - set('ACGT'):
+            continue
+        hits.append((i, '+', pwm.score(window)))
+        if both_strands:
+            hits.append((i, '-', pwm.score(Genome.get_reverse_complement(window))))
+    return hits
+
+
+@pytest.fixture(scope='module')
+def pwm():
+    return PositionWeightMatrix.from_motifs(MOTIFS)
+
+
+@pytest.mark.parametrize('sequence', ['', 'ACG', MOTIFS[0], random_sequence(3000, 1),
+                                      random_sequence(2000, 2, 'ACGTN') + MOTIFS[1]])
+@pytest.mark.parametrize('chunk_size', [1, 37, 1000000])
+@pytest.mark.parametrize('both_strands', [False, True])
+def test_scan_matches_brute_force(pwm, sequence, chunk_size, both_strands):
+    threshold = pwm.max_score / 3
+    expected = sorted(hit for hit in brute_force_hits(pwm, sequence, both_strands) if hit[2] >= threshold + 1e-9)
+    hits = list(pwm.scan(sequence, threshold, both_strands, chunk_size))
+    assert [hit[:2] for hit in hits if hit[2] >= threshold + 1e-9] == [hit[:2] for hit in expected]
+    assert [hit[2] for hit in hits if hit[2] >= threshold + 1e-9] == pytest.approx([hit[2] for hit in expected])
+    assert hits == sorted(hits)
+
+
+@pytest.mark.parametrize('n', [1, 5, 50])
+@pytest.mark.parametrize('chunk_size', [13, 1000000])
+def test_top_hits_match_brute_force(pwm, n, chunk_size):
+    sequence = random_sequence(2000, 3) + MOTIFS[0] + random_sequence(500, 4)
+    expected = sorted(brute_force_hits(pwm, sequence), key=lambda hit: -hit[2])[:n]
+    hits = pwm.top_hits(Genome(sequence), n, chunk_size=chunk_size)
+    assert [hit[2] for hit in hits] == pytest.approx([hit[2] for hit in expected])
+    assert hits[0][:2] == (2000, '+')
+    scores = {hit[:2]: hit[2] for hit in brute_force_hits(pwm, sequence)}
+    assert all(scores[hit[:2]] == pytest.approx(hit[2]) for hit in hits)
+
+
+def test_scores_and_background(pwm):
+    assert pwm.score(MOTIFS[0]) == pytest.approx(pwm.max_score)
+    assert pwm.min_score < 0 < pwm.max_score
+    background = PositionWeightMatrix.background_frequencies(Genome('AACG'))
+    assert background == {'A': 0.5, 'C': 0.25, 'G': 0.25, 'T': 0.0}
+    assert PositionWeightMatrix.background_frequencies(Genome('')) == {nuc: 0.0 for nuc in 'ACGT'}
+    skewed = PositionWeightMatrix.from_motifs(MOTIFS, background={'A': 0.4, 'C': 0.1, 'G': 0.1, 'T': 0.4})
+    assert skewed.score('CCCCCCCC') > pwm.score('CCCCCCCC')
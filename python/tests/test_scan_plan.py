@@ -0,0 +1,67 @@
+import gzip
+from collections import Counter
+
+import pytest
+
+from python.bioinformatics.genome import Genome
+from python.bioinformatics.scan_plan import ScanPlan
+
+from conftest import random_sequence
+
+
+CHUNK_SIZES = [1, 2, 3, 7, 100, 100000]
+
+
+def test_short_chunks_keep_kmers_spanning_several_chunks():
+    assert ScanPlan().kmer_counts(4).run('ACGTACGT', chunk_size=2)['kmer_counts_4']['ACGT'] == 2
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_every_analysis_matches_genome(chunk_size):
+    genome = Genome(random_sequence(600, 1))
+    patterns = ['ACG', 'TTAGC', 'GGGG']
+    results = (ScanPlan().skew().composition()
+               .kmer_counts(3).kmer_counts(5, count_reverse_complement=True, max_distance=1)
+               .pattern_matches(patterns).pattern_matches(patterns, max_distance=1)
+               .clumps(4, 50, 3).clumps(2, 10, 1)
+               .run(genome, chunk_size=chunk_size))
+
+    assert results['skew'] == genome.minimum_skew()
+    assert results['composition'] == Counter(genome.sequence)
+    assert results['kmer_counts_3'] == Genome.get_kmer_counts(genome.sequence, 3)
+    assert +results['kmer_counts_5'] == +Genome.get_kmer_counts(genome.sequence, 5, True, 1)
+    for pattern in patterns:
+        assert results['pattern_matches'][pattern] == genome.pattern_match_index(pattern)
+        assert results['pattern_matches_2'][pattern] == genome.pattern_match_index(pattern, 1)
+    assert sorted(results['clumps_4_50_3']) == sorted(genome.find_clumps(4, 50, 3))
+    assert sorted(results['clumps_2_10_1']) == sorted(genome.find_clumps(2, 10, 1))
+
+
+@pytest.mark.parametrize('sequence', ['', 'A', 'ACG', 'GGGCCC', 'ACGTNNACGTAC'])
+@pytest.mark.parametrize('chunk_size', [1, 2, 5])
+def test_short_and_ambiguous_sequences(sequence, chunk_size):
+    genome = Genome(sequence)
+    results = ScanPlan().skew().composition().kmer_counts(4).pattern_matches('ACGT').run(genome, chunk_size)
+    assert results['skew'] == genome.minimum_skew()
+    assert results['composition'] == Counter(sequence)
+    expected = Genome.get_kmer_counts(sequence, 4)
+    assert results['kmer_counts_4'] == Counter({kmer: count for kmer, count in expected.items() if 'N' not in kmer})
+    assert results['pattern_matches']['ACGT'] == genome.pattern_match_index('ACGT')
+
+
+def test_duplicate_name_and_bad_patterns():
+    with pytest.raises(ValueError):
+        ScanPlan().kmer_counts(3).kmer_counts(3)
+    with pytest.raises(ValueError):
+        ScanPlan().pattern_matches(['ACGN'])
+
+
+@pytest.mark.parametrize('chunk_size', [1, 9, 100000])
+def test_run_file(tmp_path, chunk_size):
+    sequence = random_sequence(300, 2)
+    file_path = str(tmp_path / 'genome.txt.gz')
+    with gzip.open(file_path, 'wt') as outfile:
+        outfile.write('>header\n')
+        outfile.write('\n'.join(sequence[i: i + 70] for i in range(0, len(sequence), 70)))
+    plan = lambda: ScanPlan().skew().kmer_counts(6).clumps(3, 40, 3)
+    assert plan().run_file(file_path, skip_header_rows=1, chunk_size=chunk_size) == plan().run(sequence)
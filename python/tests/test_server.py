@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+import pytest
+
+from python.bioinformatics.genome import Genome
+from python.bioinformatics.motifs import Motifs
+from python.bioinformatics.server import GenomeServer
+
+from conftest import random_sequence
+
+SEQUENCE = random_sequence(3000, 1)
+STRANDS = [random_sequence(40, seed) for seed in range(2, 7)]
+
+
+def serve(test):
+    """ Run *test(server)* against a started server """
+    async def run():
+        server = GenomeServer({'g': Genome(SEQUENCE)}, {'m': Motifs(STRANDS)}, port=0, processes=1)
+        await server.start()
+        try:
+            return await test(server)
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+
+async def request(server, target, body=None):
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    data = json.dumps(body).encode() if body is not None else b''
+    writer.write(f'POST {target} HTTP/1.1\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n'.encode()
+                 + data)
+    await writer.drain()
+    status = (await reader.readline()).decode().split(' ', 2)[1]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line == b'\r\n':
+            break
+        name, _, value = line.decode().partition(':')
+        headers[name.lower()] = value.strip()
+    payload = json.loads(await reader.readexactly(int(headers['content-length'])))
+    writer.close()
+    await writer.wait_closed()
+    return int(status), payload
+
+
+def test_queries_match_genome():
+    genome = Genome(SEQUENCE)
+
+    async def test(server):
+        assert await request(server, '/pattern_count?genome=g&pattern=ACG&max_distance=1') == \
+            (200, {'result': genome.pattern_count('ACG', 1)})
+        assert await request(server, '/pattern_match', {'genome': 'g', 'pattern': 'ACGT'}) == \
+            (200, {'result': genome.pattern_match_index('ACGT')})
+        assert await request(server, '/skew?genome=g') == (200, {'result': genome.minimum_skew()})
+        status, payload = await request(server, '/kmer_frequency?genome=g&k=4&top=3&count_reverse_complement=true')
+        expected = Genome.get_kmer_counts(SEQUENCE, 4, True)
+        assert status == 200 and [count for _, count in payload['result']] == \
+            [count for _, count in expected.most_common(3)]
+        assert await request(server, '/kmer_frequency?genome=g&k=4&pattern=AAAA') == \
+            (200, {'result': [['AAAA', Genome.get_kmer_counts(SEQUENCE, 4)['AAAA']]]})
+        assert await request(server, '/motif_search?motifs=m&k=5&method=median') == \
+            (200, {'result': Motifs(STRANDS).median_string(5)})
+
+    serve(test)
+
+
+@pytest.mark.parametrize('target, body, message', [
+    ('/pattern_count?genome=missing&pattern=A', None, 'Unknown genome missing'),
+    ('/pattern_count?genome=g', None, 'Missing parameter pattern for /pattern_count'),
+    ('/pattern_count?genome=g&pattern=A&max_distance=x', None, 'Invalid value for max_distance'),
+    ('/pattern_count?genome=g&pattern=A&colour=red', None, 'Unknown parameter colour for /pattern_count'),
+    ('/kmer_frequency?genome=g&k=3&count_reverse_complement=maybe', None, 'Invalid value for count_reverse_complement'),
+    ('/motif_search?motifs=m&k=3&method=guess', None, 'Unknown motif search method guess'),
+    ('/motif_search', {'motifs': 'other', 'k': 3}, 'Unknown motifs other'),
+    ('/skew', [1, 2], 'Request body must be a JSON object'),
+])
+def test_bad_requests_get_a_clean_message(target, body, message):
+    async def test(server):
+        status, payload = await request(server, target, body)
+        assert status == 400
+        assert message in payload['error']
+        assert not payload['error'].startswith("'")  # not the repr of a KeyError
+
+    serve(test)
+
+
+def test_failed_queries_are_counted():
+    async def test(server):
+        with pytest.raises(ValueError):
+            await server.query('/skew', {'genome': 'missing'})
+        await server.query('/skew', {'genome': 'g'})
+        assert {key: server.metrics['/skew'].summary()[key] for key in ('requests', 'errors')} == \
+            {'requests': 2, 'errors': 1}
+
+    serve(test)
+
+
+def test_unknown_endpoint():
+    async def test(server):
+        assert (await request(server, '/nothing'))[0] == 404
+
+    serve(test)
+
+
+def test_equivalent_queries_are_coalesced():
+    async def test(server):
+        results = await asyncio.gather(
+            server.query('/kmer_frequency', {'genome': 'g', 'k': '5', 'max_distance': '1'}),
+            server.query('/kmer_frequency', {'genome': 'g', 'k': 5, 'max_distance': 1, 'top': 10}),
+            server.query('/kmer_frequency', {'genome': 'g', 'k': 5, 'count_reverse_complement': 'false',
+                                             'max_distance': 1}),
+            server.query('/kmer_frequency', {'genome': 'g', 'k': 5}),
+        )
+        assert results[0] == results[1] == results[2] != results[3]
+        status, metrics = await request(server, '/metrics')
+        assert status == 200
+        assert {key: metrics['/kmer_frequency'][key] for key in ('requests', 'errors', 'coalesced')} == \
+            {'requests': 4, 'errors': 0, 'coalesced': 2}
+        assert metrics['/skew']['requests'] == 0
+
+        # once finished, the same query runs again
+        await server.query('/kmer_frequency', {'genome': 'g', 'k': 5})
+        assert server.metrics['/kmer_frequency'].summary()['coalesced'] == 2
+
+    serve(test)
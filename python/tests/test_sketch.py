@@ -0,0 +1,61 @@
+from collections import Counter
+
+import pytest
+
+from python.bioinformatics.dna import DNA
+from python.bioinformatics.sketch import CountMinSketch, HyperLogLog
+
+from conftest import random_sequence
+
+
+def test_count_min_never_undercounts():
+    codes = list(DNA.kmer_codes(random_sequence(20000, 1), 6))
+    exact = Counter(codes)
+    sketch = CountMinSketch(width=256, depth=4)
+    sketch.update_many(codes)
+    assert sketch.total == len(codes)
+    assert all(sketch.estimate(code) >= count for code, count in exact.items())
+    # within e / width * total for nearly every kmer
+    assert sum(sketch.estimate(code) - count > 2.72 / 256 * len(codes) for code, count in exact.items()) < len(exact) / 20
+
+
+def test_count_min_merge_matches_single_pass():
+    codes = list(DNA.kmer_codes(random_sequence(5000, 2), 5))
+    whole, first, second = (CountMinSketch(64, 3) for _ in range(3))
+    whole.update_many(codes)
+    first.update_many(codes[:2000])
+    second.update_many(codes[2000:])
+    assert first.merge(second).table == whole.table
+    assert first.total == whole.total
+    with pytest.raises(ValueError):
+        whole.merge(CountMinSketch(64, 3, seed=1))
+
+
+def test_count_min_heavy_hitters():
+    sequence = random_sequence(3000, 3) + 'ACGTTGCA' * 200
+    sketch = CountMinSketch(512, 5, track=10)
+    sketch.update_many(DNA.kmer_codes(sequence, 8))
+    assert DNA.pattern_to_number('ACGTTGCA') in sketch.heavy_hitters(0.04)
+    assert sketch.most_common(1)[0][1] >= Counter(DNA.kmer_codes(sequence, 8)).most_common(1)[0][1]
+    with pytest.raises(ValueError):
+        CountMinSketch().most_common()
+
+
+@pytest.mark.parametrize('distinct', [0, 10, 1000, 50000])
+def test_hyperloglog_within_error_bound(distinct):
+    estimator = HyperLogLog(precision=12)
+    estimator.update_many(range(distinct))
+    estimator.update_many(range(distinct))  # duplicates must not change the estimate
+    # 4 standard errors, the sketch only ever sees these fixed items so the test is deterministic
+    assert abs(estimator.estimate() - distinct) <= 4 * estimator.relative_error * max(distinct, 1)
+
+
+def test_hyperloglog_merge_is_union():
+    first, second, union = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+    first.update_many(range(0, 6000))
+    second.update_many(range(4000, 10000))
+    union.update_many(range(10000))
+    assert first.merge(second).registers == union.registers
+    assert HyperLogLog.from_error(0.01).relative_error <= 0.01
+    with pytest.raises(ValueError):
+        first.merge(HyperLogLog(11))
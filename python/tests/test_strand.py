@@ -0,0 +1,50 @@
+import pytest
+
+from python.bioinformatics.dna import DNA
+from python.bioinformatics.strand import StrandView
+
+from conftest import random_sequence
+
+SEQUENCE = random_sequence(300, 1) + 'NN' + random_sequence(50, 2)
+
+
+@pytest.mark.parametrize('start, end', [(0, None), (10, 200), (-50, None), (100, 100), (200, 10), (0, 1000)])
+@pytest.mark.parametrize('reverse_complement', [False, True])
+def test_view_matches_slicing(start, end, reverse_complement):
+    window = SEQUENCE[start: end]
+    expected = DNA.get_reverse_complement(window) if reverse_complement else window
+    view = StrandView(SEQUENCE, start, end, reverse_complement)
+    assert len(view) == len(expected)
+    assert str(view) == expected and view == expected
+    assert ''.join(view) == expected
+    assert ''.join(view.chunks(7)) == expected
+    assert [view[i] for i in range(len(view))] == list(expected)
+    assert [view[-i] for i in range(1, len(view) + 1)] == [expected[-i] for i in range(1, len(expected) + 1)]
+    for a, b in [(0, 5), (3, -3), (-10, None), (5, 2), (None, None)]:
+        assert str(view[a: b]) == expected[a: b]
+    assert view[::2] == expected[::2]
+    assert list(view.kmers(4, chunk_size=9)) == [expected[i: i + 4] for i in range(len(expected) - 3)]
+    assert str(view.reverse_complement()) == DNA.get_reverse_complement(expected)
+    assert view.reverse_complement().reverse_complement() == view
+
+
+def test_index_errors_and_equality():
+    view = StrandView('ACGT', reverse_complement=True)
+    with pytest.raises(IndexError):
+        view[4]
+    with pytest.raises(IndexError):
+        view[-5]
+    assert view == 'ACGT'  # a palindrome
+    assert view != StrandView('ACGA', reverse_complement=True)
+    assert view != 'ACG'
+    assert (view == 3) is False
+
+
+def test_reverse_strand_rejects_other_characters():
+    view = StrandView('ACgT', reverse_complement=True)
+    assert view[0] == 'A'
+    with pytest.raises(KeyError):
+        view[1]
+    with pytest.raises(KeyError):
+        str(view)
+    assert str(view.reverse_complement()) == 'ACgT'